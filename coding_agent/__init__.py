@@ -9,11 +9,17 @@ development workflow with sandboxed execution.
 __version__ = "0.1.0"
 __author__ = "AI Coding Agent"
 
-from .core.intent_parser import IntentParser
-from .core.code_generator import CodeGenerator
-from .execution.sandbox import SandboxExecutor
-from .context.session_manager import SessionManager
-from .cli.interface import CLIInterface
+import importlib
+
+# Public names are resolved on first access so that importing the package
+# (e.g. for --help or --version) doesn't pull in the LLM and sandbox SDKs.
+_LAZY_IMPORTS = {
+    "IntentParser": ".core.intent_parser",
+    "CodeGenerator": ".core.code_generator",
+    "SandboxExecutor": ".execution.sandbox",
+    "SessionManager": ".context.session_manager",
+    "CLIInterface": ".cli.interface",
+}
 
 __all__ = [
     "IntentParser",
@@ -22,3 +28,19 @@ __all__ = [
     "SessionManager",
     "CLIInterface",
 ]
+
+
+def __getattr__(name):
+    """Lazily import public classes on first attribute access."""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include lazily imported names in dir() output."""
+    return sorted(set(globals()) | set(__all__))
@@ -3,9 +3,15 @@ Enhanced Terminal UI - Makes the terminal experience more like an IDE.
 Provides split-screen, file browser, diffs, and better visuals.
 """
 
+import io
 import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Optional, Tuple
 from rich.console import Console
 from rich.layout import Layout
 from rich.panel import Panel
@@ -14,24 +20,130 @@ from rich.table import Table
 from rich.syntax import Syntax
 from rich.text import Text
 from rich.live import Live
+from rich.markup import escape
 from difflib import unified_diff
+from pygments.lexer import Lexer
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# File icons keyed by extension
+_FILE_ICONS = MappingProxyType({
+    '.py': '🐍',
+    '.js': '📜',
+    '.ts': '📘',
+    '.html': '🌐',
+    '.css': '🎨',
+    '.json': '📋',
+    '.md': '📝',
+    '.yml': '⚙️',
+    '.yaml': '⚙️',
+    '.txt': '📄',
+    '.sh': '⚡',
+})
+
+# Syntax highlighting language keyed by extension
+_LANG_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.html': 'html',
+    '.css': 'css',
+    '.json': 'json',
+    '.md': 'markdown',
+    '.sh': 'bash',
+    '.yml': 'yaml',
+    '.yaml': 'yaml'
+})
+
+# Directory listings run concurrently per tree level; the work is syscall-bound
+_TREE_WORKERS = 8
+
+# Levels with fewer directories than this are listed serially
+_TREE_PARALLEL_MIN = 4
+
+_tree_pool: Optional[ThreadPoolExecutor] = None
+
+# Number of rendered file-browser trees kept for reuse
+_TREE_CACHE_SIZE = 8
+
+# Diffs longer than this can't be shown in a terminal panel anyway
+_MAX_DIFF_LINES = 500
+
+# Diff line styles keyed by the line's first character; hunk headers are the
+# only lines starting with '@'. The ---/+++ file headers are always the first
+# two lines of a unified diff and are styled by position instead.
+_DIFF_STYLES = {
+    '@': 'bold blue',
+    '+': 'green',
+    '-': 'red',
+}
+_DIFF_HEADER_STYLE = 'bold cyan'
+
+# Files larger than this are truncated before highlighting
+_MAX_RENDER_BYTES = 512 * 1024
+
+# Rows shown by the side-by-side comparison
+_SIDE_BY_SIDE_LINES = 20
+_SIDE_BY_SIDE_WIDTH = 80
+
+
+@lru_cache(maxsize=32)
+def _read_for_render(file_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Read file content for display, capped at _MAX_RENDER_BYTES.
+    mtime_ns and size are only part of the cache key, so edits invalidate it.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read(_MAX_RENDER_BYTES)
+    
+    content = data.decode('utf-8', errors='replace')
+    if size > _MAX_RENDER_BYTES:
+        content += "\n... (truncated)"
+    return content
+
+
+@lru_cache(maxsize=None)
+def _get_lexer(language: str) -> Optional[Lexer]:
+    """
+    Resolve a Pygments lexer once per language.
+    Syntax otherwise looks the lexer up by name several times per render.
+    """
+    try:
+        return get_lexer_by_name(language)
+    except ClassNotFound:
+        return None
+
+
+def _get_tree_pool() -> ThreadPoolExecutor:
+    """Create the shared directory-listing pool on first use and reuse it across renders."""
+    global _tree_pool
+    if _tree_pool is None:
+        _tree_pool = ThreadPoolExecutor(max_workers=_TREE_WORKERS, thread_name_prefix="tree-list")
+    return _tree_pool
+
 
 class EnhancedUI:
     """Enhanced terminal UI with IDE-like features."""
     
+    # Files/dirs hidden from the browser, shared by all instances
+    ignore_patterns = frozenset({
+        '__pycache__', '.git', '.venv', 'venv', 'node_modules',
+        '.env', '.DS_Store', '.pytest_cache'
+    })
+    
     def __init__(self, console: Console):
         self.console = console
         self.current_file = None
         self.file_content = None
-        self.ignore_patterns = {
-            '__pycache__', '.git', '.venv', 'venv', 'node_modules',
-            '.env', '.DS_Store', '.pytest_cache'
-        }
+        # (root, current_file) -> (tree, {listed dir: mtime_ns}), in LRU order
+        self._tree_cache: OrderedDict = OrderedDict()
+        # Static panels are built on first use and reused afterwards
+        self._help_panel: Optional[Panel] = None
+        self._command_palettes: Dict[Tuple[Tuple[str, str], ...], Panel] = {}
     
     def create_split_layout(self) -> Layout:
         """Create split-screen layout."""
@@ -51,91 +163,138 @@ class EnhancedUI:
         return layout
     
     def render_file_browser(self, root_path: str = ".", current_file: Optional[str] = None) -> Tree:
-        """Render file browser tree."""
+        """Render file browser tree, reusing the last one if no listed directory changed."""
+        cache_key = (os.path.abspath(root_path), root_path, current_file)
+        cached = self._tree_cache.get(cache_key)
+        if cached is not None and self._dirs_unchanged(cached[1]):
+            self._tree_cache.move_to_end(cache_key)
+            return cached[0]
+        
         root = Path(root_path)
         tree = Tree(
             f"📁 [bold cyan]{root.name or 'Project'}[/bold cyan]",
             guide_style="dim"
         )
         
-        self._build_tree(tree, root, current_file, max_depth=3)
+        dir_mtimes: Dict[str, Optional[int]] = {}
+        self._build_tree(tree, root, current_file, max_depth=3, dir_mtimes=dir_mtimes)
+        
+        self._tree_cache[cache_key] = (tree, dir_mtimes)
+        self._tree_cache.move_to_end(cache_key)
+        if len(self._tree_cache) > _TREE_CACHE_SIZE:
+            self._tree_cache.popitem(last=False)
+        
         return tree
     
+    @staticmethod
+    def _dirs_unchanged(dir_mtimes: Dict[str, Optional[int]]) -> bool:
+        """Check that every directory listed for a cached tree still has the same mtime."""
+        try:
+            return all(
+                mtime is not None and os.stat(dir_path).st_mtime_ns == mtime
+                for dir_path, mtime in dir_mtimes.items()
+            )
+        except OSError:
+            return False
+    
     def _build_tree(self, tree: Tree, path: Path, current_file: Optional[str], 
-                    max_depth: int, current_depth: int = 0):
-        """Recursively build file tree."""
-        if current_depth >= max_depth:
-            return
+                    max_depth: int, current_depth: int = 0,
+                    dir_mtimes: Optional[Dict[str, Optional[int]]] = None):
+        """
+        Build file tree breadth-first, listing each larger level's directories in parallel.
+        If dir_mtimes is given, it is filled with the mtime of every directory listed.
+        """
+        level = [(tree, path)]
         
-        try:
-            items = sorted(path.iterdir(), key=lambda x: (not x.is_dir(), x.name))
-        except PermissionError:
-            return
+        # Compare against the current file by parent/name so file entries need no Path objects
+        current = Path(current_file) if current_file else None
         
-        for item in items:
-            # Skip ignored patterns
-            if any(pattern in str(item) for pattern in self.ignore_patterns):
-                continue
+        for _ in range(current_depth, max_depth):
+            if not level:
+                break
             
-            # Determine icon and style
-            if item.is_dir():
-                icon = "📁"
-                style = "bold blue"
-                branch = tree.add(f"{icon} [{style}]{item.name}[/{style}]")
-                self._build_tree(branch, item, current_file, max_depth, current_depth + 1)
+            next_level = []
+            dir_paths = [dir_path for _, dir_path in level]
+            if len(dir_paths) < _TREE_PARALLEL_MIN:
+                listings = map(self._list_dir, dir_paths)
             else:
-                # File icon based on extension
-                icon = self._get_file_icon(item.suffix)
-                style = "cyan" if str(item) == current_file else "white"
-                marker = "→ " if str(item) == current_file else ""
-                tree.add(f"{marker}{icon} [{style}]{item.name}[/{style}]")
+                listings = _get_tree_pool().map(self._list_dir, dir_paths)
+            
+            # Both maps preserve order, so branches are filled in insertion order
+            for (branch, dir_path), (mtime, dirs, files) in zip(level, listings):
+                if dir_mtimes is not None:
+                    dir_mtimes[str(dir_path)] = mtime
+                
+                in_current_dir = current is not None and current.parent == dir_path
+                
+                # Directories first; ignored entries were already filtered out
+                for name in dirs:
+                    icon = "📁"
+                    style = "bold blue"
+                    child = branch.add(f"{icon} [{style}]{name}[/{style}]")
+                    next_level.append((child, dir_path / name))
+                
+                for name in files:
+                    # File icon based on extension
+                    icon = self._get_file_icon(os.path.splitext(name)[1])
+                    is_current = in_current_dir and name == current.name
+                    style = "cyan" if is_current else "white"
+                    marker = "→ " if is_current else ""
+                    branch.add(f"{marker}{icon} [{style}]{name}[/{style}]")
+            
+            level = next_level
+    
+    @classmethod
+    def _list_dir(cls, path: Path) -> Tuple[Optional[int], List[str], List[str]]:
+        """
+        List a directory's subdirectory and file names, each sorted, skipping ignored entries.
+        Returns the directory's mtime (taken before listing) with the names.
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        dirs = []
+        files = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.name in cls.ignore_patterns:
+                        continue
+                    # is_dir() uses the d_type from the directory read, no extra stat
+                    (dirs if entry.is_dir() else files).append(entry.name)
+        except PermissionError:
+            return mtime, [], []
+        
+        dirs.sort()
+        files.sort()
+        return mtime, dirs, files
     
     def _get_file_icon(self, extension: str) -> str:
         """Get icon for file type."""
-        icons = {
-            '.py': '🐍',
-            '.js': '📜',
-            '.ts': '📘',
-            '.html': '🌐',
-            '.css': '🎨',
-            '.json': '📋',
-            '.md': '📝',
-            '.yml': '⚙️',
-            '.yaml': '⚙️',
-            '.txt': '📄',
-            '.sh': '⚡',
-        }
-        return icons.get(extension, '📄')
+        return _FILE_ICONS.get(extension, '📄')
     
     def render_file_content(self, file_path: str, highlight_lines: Optional[List[int]] = None) -> Panel:
         """Render file content with syntax highlighting."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            st = os.stat(file_path)
+            content = _read_for_render(file_path, st.st_mtime_ns, st.st_size)
             
             # Detect language from extension
             ext = Path(file_path).suffix
-            lang_map = {
-                '.py': 'python',
-                '.js': 'javascript',
-                '.ts': 'typescript',
-                '.html': 'html',
-                '.css': 'css',
-                '.json': 'json',
-                '.md': 'markdown',
-                '.sh': 'bash',
-                '.yml': 'yaml',
-                '.yaml': 'yaml'
-            }
-            language = lang_map.get(ext, 'text')
+            language = _LANG_MAP.get(ext, 'text')
+            
+            line_count = content.count('\n') + 1
             
             # Create syntax highlighted content
             syntax = Syntax(
                 content,
-                language,
+                _get_lexer(language) or language,
                 theme="monokai",
                 line_numbers=True,
                 word_wrap=False,
+                background_color="default",
                 highlight_lines=set(highlight_lines) if highlight_lines else None
             )
             
@@ -143,7 +302,7 @@ class EnhancedUI:
                 syntax,
                 title=f"[bold cyan]FILE: {file_path}",
                 border_style="cyan",
-                subtitle=f"[dim]{len(content)} chars | {content.count(chr(10)) + 1} lines | {language}[/dim]"
+                subtitle=f"[dim]{len(content)} chars | {line_count} lines | {language}[/dim]"
             )
         except Exception as e:
             return Panel(
@@ -154,35 +313,32 @@ class EnhancedUI:
     
     def render_diff(self, old_content: str, new_content: str, file_path: str) -> Panel:
         """Render side-by-side diff with colors."""
-        old_lines = old_content.splitlines(keepends=True)
-        new_lines = new_content.splitlines(keepends=True)
-        
-        diff = list(unified_diff(
-            old_lines,
-            new_lines,
+        diff = unified_diff(
+            old_content.splitlines(),
+            new_content.splitlines(),
             fromfile=f"{file_path} (original)",
             tofile=f"{file_path} (modified)",
             lineterm=''
-        ))
-        
-        # Colorize diff
-        colored_diff = []
-        for line in diff:
-            if line.startswith('+++') or line.startswith('---'):
-                colored_diff.append(f"[bold cyan]{line}[/bold cyan]")
-            elif line.startswith('@@'):
-                colored_diff.append(f"[bold blue]{line}[/bold blue]")
-            elif line.startswith('+'):
-                colored_diff.append(f"[green]{line}[/green]")
-            elif line.startswith('-'):
-                colored_diff.append(f"[red]{line}[/red]")
-            else:
-                colored_diff.append(f"[dim]{line}[/dim]")
+        )
         
-        diff_text = '\n'.join(colored_diff)
+        # Colorize diff, streaming lines into one buffer and stopping at the display limit
+        buffer = io.StringIO()
+        truncated = False
+        for count, line in enumerate(diff):
+            if count == _MAX_DIFF_LINES:
+                truncated = True
+                break
+            if count:
+                buffer.write('\n')
+            
+            style = _DIFF_HEADER_STYLE if count < 2 else _DIFF_STYLES.get(line[:1], 'dim')
+            buffer.write(f"[{style}]{line}[/{style}]")
+        
+        if truncated:
+            buffer.write(f"\n[dim]... (diff truncated after {_MAX_DIFF_LINES} lines)[/dim]")
         
         return Panel(
-            diff_text,
+            buffer.getvalue(),
             title=f"[bold yellow]DIFF: {file_path}",
             border_style="yellow",
             subtitle="[green]+[/green] additions | [red]-[/red] deletions"
@@ -190,43 +346,52 @@ class EnhancedUI:
     
     def render_side_by_side_diff(self, old_content: str, new_content: str) -> Table:
         """Render side-by-side comparison."""
-        old_lines = old_content.splitlines()
-        new_lines = new_content.splitlines()
+        # Only the visible window is split; the rest is just counted
+        old_lines = [line.rstrip('\r\n') for line in islice(io.StringIO(old_content), _SIDE_BY_SIDE_LINES)]
+        new_lines = [line.rstrip('\r\n') for line in islice(io.StringIO(new_content), _SIDE_BY_SIDE_LINES)]
         
         table = Table(show_header=True, header_style="bold cyan", expand=True)
         table.add_column("Original", style="dim", width=50)
         table.add_column("Modified", style="white", width=50)
         
-        max_lines = max(len(old_lines), len(new_lines))
+        max_lines = max(self._count_lines(old_content), self._count_lines(new_content))
         
-        for i in range(min(max_lines, 20)):  # Limit to 20 lines for display
+        for i in range(min(max_lines, _SIDE_BY_SIDE_LINES)):  # Limit rows for display
             old_line = old_lines[i] if i < len(old_lines) else ""
             new_line = new_lines[i] if i < len(new_lines) else ""
             
             # Highlight differences
             if old_line != new_line:
-                if old_line:
-                    old_style = "[red]"
-                else:
-                    old_style = "[dim]"
-                if new_line:
-                    new_style = "[green]"
-                else:
-                    new_style = "[dim]"
+                old_style = "[red]" if old_line else "[dim]"
+                new_style = "[green]" if new_line else "[dim]"
             else:
                 old_style = "[dim]"
                 new_style = "[dim]"
             
             table.add_row(
-                f"{old_style}{old_line[:80]}...[/]" if len(old_line) > 80 else f"{old_style}{old_line}[/]",
-                f"{new_style}{new_line[:80]}...[/]" if len(new_line) > 80 else f"{new_style}{new_line}[/]"
+                self._truncate_cell(old_style, old_line),
+                self._truncate_cell(new_style, new_line)
             )
         
-        if max_lines > 20:
-            table.add_row("[dim]...[/dim]", f"[dim]... ({max_lines - 20} more lines)[/dim]")
+        if max_lines > _SIDE_BY_SIDE_LINES:
+            table.add_row("[dim]...[/dim]", f"[dim]... ({max_lines - _SIDE_BY_SIDE_LINES} more lines)[/dim]")
         
         return table
     
+    @staticmethod
+    def _count_lines(content: str) -> int:
+        """Count lines the way str.splitlines would, without splitting."""
+        if not content:
+            return 0
+        return content.count('\n') + (not content.endswith('\n'))
+    
+    @staticmethod
+    def _truncate_cell(style: str, line: str) -> str:
+        """Format a side-by-side cell, truncating long lines."""
+        if len(line) > _SIDE_BY_SIDE_WIDTH:
+            return f"{style}{line[:_SIDE_BY_SIDE_WIDTH]}...[/]"
+        return f"{style}{line}[/]"
+    
     def render_file_list(self, files: List[str], current_index: int = 0) -> Table:
         """Render selectable file list."""
         table = Table(show_header=False, box=None, padding=(0, 1))
@@ -243,6 +408,11 @@ class EnhancedUI:
     
     def render_command_palette(self, commands: List[Tuple[str, str]]) -> Panel:
         """Render command palette with shortcuts."""
+        palette_key = tuple(commands)
+        panel = self._command_palettes.get(palette_key)
+        if panel is not None:
+            return panel
+        
         table = Table(show_header=False, box=None, padding=(0, 2))
         table.add_column("Key", style="bold cyan", width=15)
         table.add_column("Command", style="white")
@@ -250,40 +420,33 @@ class EnhancedUI:
         for key, command in commands:
             table.add_row(key, command)
         
-        return Panel(
+        panel = Panel(
             table,
             title="⌨️  Commands",
             border_style="cyan",
             subtitle="[dim]Press key to execute[/dim]"
         )
+        self._command_palettes[palette_key] = panel
+        return panel
     
     def render_status_bar(self, info: dict) -> Panel:
         """Render status bar with session info."""
-        status_text = Text()
-        
         # Session info
-        status_text.append("Session: ", style="cyan")
-        status_text.append(f"{info.get('session_id', 'N/A')[:12]}", style="dim")
-        status_text.append(" | ", style="dim")
+        markup = f"[cyan]Session: [/cyan][dim]{escape(str(info.get('session_id', 'N/A'))[:12])} | [/dim]"
         
         # File info
         if info.get('current_file'):
-            status_text.append("File: ", style="cyan")
-            status_text.append(info['current_file'], style="white")
-            status_text.append(" | ", style="dim")
+            markup += f"[cyan]File: [/cyan][white]{escape(info['current_file'])}[/white][dim] | [/dim]"
         
         # Messages
-        status_text.append("Messages: ", style="cyan")
-        status_text.append(f"{info.get('messages', 0)}", style="dim")
-        status_text.append(" | ", style="dim")
+        markup += f"[cyan]Messages: [/cyan][dim]{info.get('messages', 0)} | [/dim]"
         
         # Codebase
         if info.get('indexed_files'):
-            status_text.append("Indexed: ", style="cyan")
-            status_text.append(f"{info['indexed_files']} files", style="dim")
+            markup += f"[cyan]Indexed: [/cyan][dim]{info['indexed_files']} files[/dim]"
         
         return Panel(
-            status_text,
+            Text.from_markup(markup),
             border_style="blue",
             height=3
         )
@@ -318,9 +481,10 @@ class EnhancedUI:
         """Render live code preview as AI generates."""
         syntax = Syntax(
             code,
-            language,
+            _get_lexer(language) or language,
             theme="monokai",
-            line_numbers=True
+            line_numbers=True,
+            background_color="default"
         )
         
         return Panel(
@@ -336,6 +500,9 @@ class EnhancedUI:
     
     def render_help_sidebar(self) -> Panel:
         """Render help sidebar with tips."""
+        if self._help_panel is not None:
+            return self._help_panel
+        
         help_text = """
 [bold cyan]Quick Commands:[/bold cyan]
 
@@ -356,25 +523,39 @@ class EnhancedUI:
 
 [dim]Tip: Use tab for completion[/dim]
 """
-        return Panel(
+        self._help_panel = Panel(
             help_text,
             title="💡 Help",
             border_style="cyan"
         )
+        return self._help_panel
     
     def get_file_list(self, directory: str = ".") -> List[str]:
         """Get list of files in directory."""
-        files = []
-        root = Path(directory)
-        
-        for item in root.rglob("*"):
-            if item.is_file():
-                # Skip ignored patterns
-                if any(pattern in str(item) for pattern in self.ignore_patterns):
-                    continue
-                files.append(str(item.relative_to(root)))
+        return sorted(self._walk(directory))
+    
+    def _walk(self, root: str):
+        """Yield relative file paths under root, pruning ignored directories."""
+        stack = [("", root)]
         
-        return sorted(files)
+        while stack:
+            relpath, abspath = stack.pop()
+            try:
+                entries = os.scandir(abspath)
+            except OSError:
+                continue
+            
+            with entries:
+                for entry in entries:
+                    if entry.name in self.ignore_patterns:
+                        continue
+                    
+                    entry_rel = relpath + os.sep + entry.name if relpath else entry.name
+                    # DirEntry caches d_type, so these checks avoid an extra stat()
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((entry_rel, entry.path))
+                    elif entry.is_file():
+                        yield entry_rel
     
     def render_context_panel(self, context: dict) -> Panel:
         """Render current context information."""
@@ -4,7 +4,7 @@ import click
 import asyncio
 import sys
 from typing import Optional, Dict, Any
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.text import Text
 from rich.table import Table
@@ -12,13 +12,14 @@ from rich.prompt import Prompt, Confirm
 from rich.live import Live
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+from .. import __version__
 from ..core.intent_parser import IntentParser
 from ..core.code_generator import CodeGenerator
 from ..execution.sandbox import SandboxExecutor
 from ..context.session_manager import SessionManager
 from ..utils.llm_client import LLMClientFactory
 from ..utils.file_manager import FileManager
-from ..utils.logger import get_logger, setup_rich_logging
+from ..utils.logger import get_logger, setup_logging, setup_rich_logging
 
 console = Console()
 logger = get_logger(__name__)
@@ -27,6 +28,8 @@ logger = get_logger(__name__)
 class CLIInterface:
     """Main CLI interface for the coding agent."""
     
+    _FILE_OPERATIONS = frozenset({"create", "replace", "delete"})
+    
     def __init__(self):
         self.console = console
         self.session_manager = None
@@ -34,6 +37,7 @@ class CLIInterface:
         self.code_generator = None
         self.sandbox_executor = None
         self.file_manager = None
+        self._processing_panels: Dict[str, Panel] = {}
         
     async def initialize(self, project_root: str = "."):
         """Initialize the CLI with all components."""
@@ -137,13 +141,17 @@ class CLIInterface:
             logger.error(f"Request processing failed: {e}")
     
     def _create_processing_display(self, message: str = "Processing...") -> Panel:
-        """Create processing display."""
-        return Panel(
-            f"[yellow]{message}[/yellow]\n"
-            "[dim]Please wait while I understand your request...[/dim]",
-            title="🤖 AI Agent",
-            border_style="yellow"
-        )
+        """Create processing display, reusing the panel built for the same message."""
+        panel = self._processing_panels.get(message)
+        if panel is None:
+            panel = Panel(
+                f"[yellow]{message}[/yellow]\n"
+                "[dim]Please wait while I understand your request...[/dim]",
+                title="🤖 AI Agent",
+                border_style="yellow"
+            )
+            self._processing_panels[message] = panel
+        return panel
     
     def _display_intent(self, intent):
         """Display parsed intent to user."""
@@ -160,21 +168,24 @@ class CLIInterface:
         if intent.parameters:
             table.add_row("Parameters", str(intent.parameters))
         
-        self.console.print(table)
+        # Collect everything and print once: a single markup pass and terminal write
+        renderables = [table]
         
         # Show code edits if any
         if intent.code_edits:
-            self.console.print("\n[bold green]📝 Generated Code Changes:[/bold green]")
+            renderables.append("\n[bold green]📝 Generated Code Changes:[/bold green]")
             for i, edit in enumerate(intent.code_edits, 1):
-                self.console.print(f"\n[bold]Edit {i}:[/bold] {edit.file_path}")
-                self.console.print(f"[dim]Operation: {edit.operation}[/dim]")
+                renderables.append(f"\n[bold]Edit {i}:[/bold] {edit.file_path}")
+                renderables.append(f"[dim]Operation: {edit.operation}[/dim]")
                 if edit.description:
-                    self.console.print(f"[dim]Description: {edit.description}[/dim]")
+                    renderables.append(f"[dim]Description: {edit.description}[/dim]")
                 
                 # Show code preview
                 if edit.content:
                     preview = edit.content[:200] + "..." if len(edit.content) > 200 else edit.content
-                    self.console.print(Panel(preview, title="Code Preview", border_style="blue"))
+                    renderables.append(Panel(preview, title="Code Preview", border_style="blue"))
+        
+        self.console.print(Group(*renderables))
     
     async def _execute_code(self, intent):
         """Execute code in sandbox."""
@@ -212,15 +223,17 @@ class CLIInterface:
         table.add_row("Exit Code", str(result.exit_code))
         table.add_row("Execution Time", f"{result.execution_time:.2f}s")
         
-        self.console.print(table)
+        renderables = [table]
         
         if result.stdout:
-            self.console.print("\n[bold green]📤 Output:[/bold green]")
-            self.console.print(Panel(result.stdout, border_style="green"))
+            renderables.append("\n[bold green]📤 Output:[/bold green]")
+            renderables.append(Panel(result.stdout, border_style="green"))
         
         if result.stderr:
-            self.console.print("\n[bold red]📥 Error Output:[/bold red]")
-            self.console.print(Panel(result.stderr, border_style="red"))
+            renderables.append("\n[bold red]📥 Error Output:[/bold red]")
+            renderables.append(Panel(result.stderr, border_style="red"))
+        
+        self.console.print(Group(*renderables))
     
     async def _apply_file_changes(self, intent):
         """Apply file changes to the filesystem."""
@@ -235,25 +248,47 @@ class CLIInterface:
         
         self.console.print("\n[bold green]💾 Applying file changes...[/bold green]")
         
-        for edit in intent.code_edits:
+        # Group edits by file: different files are written concurrently in
+        # worker threads, edits to the same file keep their order
+        edits_by_file: Dict[str, list] = {}
+        for index, edit in enumerate(intent.code_edits):
+            if edit.operation not in self._FILE_OPERATIONS:
+                self.console.print(f"[yellow]⚠️  Unknown operation: {edit.operation}[/yellow]")
+                continue
+            edits_by_file.setdefault(edit.file_path, []).append((index, edit))
+        
+        results: Dict[int, Any] = {}
+        await asyncio.gather(*(
+            self._apply_edits_in_order(edits, results) for edits in edits_by_file.values()
+        ))
+        
+        for index, edit in enumerate(intent.code_edits):
+            if index not in results:
+                continue
+            
+            result = results[index]
+            if isinstance(result, Exception):
+                self.console.print(f"[red]❌ Error with {edit.file_path}: {result}[/red]")
+            elif result:
+                self.console.print(f"[green]✅ {edit.operation.capitalize()}d: {edit.file_path}[/green]")
+            else:
+                self.console.print(f"[red]❌ Failed to {edit.operation}: {edit.file_path}[/red]")
+    
+    async def _apply_edits_in_order(self, edits, results: Dict[int, Any]) -> None:
+        """Apply a single file's edits sequentially without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        
+        for index, edit in edits:
             try:
-                if edit.operation == "create":
-                    success = self.file_manager.write_file(edit.file_path, edit.content)
-                elif edit.operation == "replace":
-                    success = self.file_manager.write_file(edit.file_path, edit.content)
-                elif edit.operation == "delete":
-                    success = self.file_manager.delete_file(edit.file_path)
-                else:
-                    self.console.print(f"[yellow]⚠️  Unknown operation: {edit.operation}[/yellow]")
-                    continue
-                
-                if success:
-                    self.console.print(f"[green]✅ {edit.operation.capitalize()}d: {edit.file_path}[/green]")
-                else:
-                    self.console.print(f"[red]❌ Failed to {edit.operation}: {edit.file_path}[/red]")
-                    
+                results[index] = await loop.run_in_executor(None, self._apply_edit, edit)
             except Exception as e:
-                self.console.print(f"[red]❌ Error with {edit.file_path}: {e}[/red]")
+                results[index] = e
+    
+    def _apply_edit(self, edit) -> bool:
+        """Apply one file edit (runs in a worker thread)."""
+        if edit.operation == "delete":
+            return self.file_manager.delete_file(edit.file_path)
+        return self.file_manager.write_file(edit.file_path, edit.content)
     
     async def cleanup(self):
         """Cleanup resources."""
@@ -262,7 +297,7 @@ class CLIInterface:
                 await self.sandbox_executor.terminate_sandbox()
             
             if self.session_manager:
-                await self.session_manager.save_session()
+                await self.session_manager.flush_session()
             
             self.console.print("[dim]Cleaned up resources[/dim]")
             
@@ -270,8 +305,11 @@ class CLIInterface:
             logger.error(f"Cleanup error: {e}")
 
 
+@click.command(context_settings={"help_option_names": ["-h", "--help"]})
+@click.version_option(__version__, prog_name="coding-agent")
 def main():
-    """Main entry point for CLI."""
+    """Terminal-based AI coding agent: describe what you want in plain English."""
+    setup_logging()
     cli = CLIInterface()
     
     try:
@@ -5,63 +5,281 @@ This gives the AI complete knowledge of your codebase - like Cursor!
 
 import os
 import ast
+import inspect
 import json
+import re
+import sys
+import threading
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Set, Any, Optional
+from typing import Dict, List, NamedTuple, Set, Any, Optional, Tuple
 from datetime import datetime
+from types import MappingProxyType
 import hashlib
+import heapq
+from concurrent.futures import ThreadPoolExecutor
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Worker threads for reading and parsing changed files
+_INDEX_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# JS/TS imports: `import x from "m"`, side-effect `import "m"`, and `require("m")`
+# Matched on raw bytes so non-Python files never need decoding
+_JS_IMPORT_RE = re.compile(rb'''\b(?:import\s+(?:[^'"]+?\s+from\s+)?|require\s*\()\s*['"]([^'"]+)['"]''')
+
+# The content hash is only a change fingerprint, so use the fastest one available
+try:
+    import xxhash
+    
+    def _fingerprint(data: bytes) -> str:
+        return xxhash.xxh3_64_hexdigest(data)
+except ImportError:
+    def _fingerprint(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode the sets stored in the index maps as JSON arrays."""
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+# Index files can be several megabytes; prefer orjson, then ujson, then the stdlib
+try:
+    import orjson
+    
+    def _dump_index(data: Dict[str, Any], indent: bool = True) -> bytes:
+        return orjson.dumps(data, default=_json_default, option=orjson.OPT_INDENT_2 if indent else None)
+    
+    _load_index = orjson.loads
+except ImportError:
+    try:
+        import ujson as _json_impl
+    except ImportError:
+        _json_impl = json
+    
+    def _dump_index(data: Dict[str, Any], indent: bool = True) -> bytes:
+        return _json_impl.dumps(data, indent=2 if indent else None, default=_json_default).encode('utf-8')
+    
+    _load_index = _json_impl.loads
+
+# tree-sitter's C parser is much faster than ast on large files; it is optional
+try:
+    import tree_sitter
+    import tree_sitter_python
+    
+    _TS_PYTHON = tree_sitter.Language(tree_sitter_python.language())
+except (ImportError, TypeError, ValueError):
+    # Not installed, or a tree-sitter too old for the Language(capsule) API
+    _TS_PYTHON = None
+
+_ts_local = threading.local()
+
+
+def _ts_parser() -> "tree_sitter.Parser":
+    """Get this thread's tree-sitter parser (parsers aren't safe to share across threads)."""
+    parser = getattr(_ts_local, 'parser', None)
+    if parser is None:
+        parser = _ts_local.parser = tree_sitter.Parser(_TS_PYTHON)
+    return parser
+
+
+def _ts_text(node) -> str:
+    """Get the source text of a tree-sitter node, without whitespace (for dotted names)."""
+    return ''.join(node.text.decode('utf-8', errors='replace').split())
+
+
+# Replaying the delta log costs more than reading a fresh snapshot once the log
+# grows past this fraction of the snapshot's size
+_DELTA_LOG_COMPACT_RATIO = 0.5
+
+# Symbols keep only the start of their docstring, which is what search and
+# context display need
+_DOCSTRING_SUMMARY_CHARS = 200
+
+# File extension -> language name
+_EXT_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript',
+    '.ts': 'typescript',
+    '.jsx': 'javascript',
+    '.tsx': 'typescript',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.rb': 'ruby',
+    '.php': 'php',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.sh': 'bash'
+})
+
+
+class Symbol(NamedTuple):
+    """A function or class defined in an indexed file."""
+    type: str
+    name: str
+    line: int
+    docstring: Optional[str]
+
+
+class FileInfo(NamedTuple):
+    """Index entry for a single file."""
+    path: str
+    size: int
+    mtime_ns: int
+    lines: int
+    language: str
+    hash: str
+    modified: str
+    symbols: Tuple[Symbol, ...] = ()
+    imports: Tuple[str, ...] = ()
+    
+    @property
+    def content_key(self) -> str:
+        """Key shared by all files with the same language and contents (and so the same symbols/imports)."""
+        return f"{self.language}:{self.hash}"
+    
+    def to_dict(self, include_content: bool = True) -> Dict[str, Any]:
+        """Convert to a JSON-serializable dict, optionally leaving out symbols and imports."""
+        data = self._asdict()
+        if include_content:
+            data.update(self.content_to_dict())
+        else:
+            del data['symbols'], data['imports']
+        return data
+    
+    def content_to_dict(self) -> Dict[str, Any]:
+        """Convert just the symbols and imports to a JSON-serializable dict."""
+        return {
+            'symbols': [symbol._asdict() for symbol in self.symbols],
+            'imports': list(self.imports)
+        }
+    
+    @staticmethod
+    def content_from_dict(data: Dict[str, Any]) -> Tuple[Tuple[Symbol, ...], Tuple[str, ...]]:
+        """Rebuild (symbols, imports) from the output of content_to_dict or to_dict."""
+        symbols = tuple(
+            Symbol(**{**symbol, 'name': sys.intern(symbol['name'])})
+            for symbol in data.get('symbols', ())
+        )
+        imports = tuple(sys.intern(name) for name in data.get('imports', ()))
+        return symbols, imports
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any],
+                  content: Optional[Tuple[Tuple[Symbol, ...], Tuple[str, ...]]] = None) -> 'FileInfo':
+        """Rebuild an entry from the output of to_dict, with already-rebuilt content if given."""
+        symbols, imports = content if content is not None else cls.content_from_dict(data)
+        return cls(**{
+            **data,
+            'path': sys.intern(data['path']),
+            'symbols': symbols,
+            'imports': imports
+        })
+
 
 class CodebaseIndexer:
     """Indexes entire codebase for AI context awareness."""
     
+    # Files/dirs to ignore
+    ignore_patterns = frozenset({
+        '__pycache__', '.git', '.venv', 'venv', 'node_modules',
+        '.env', '.pyc', '.so', '.dylib', '.egg-info', 'dist',
+        'build', '.DS_Store', '.pytest_cache', '.mypy_cache'
+    })
+    
+    code_extensions = frozenset({
+        '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp',
+        '.c', '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php',
+        '.swift', '.kt', '.scala', '.sh', '.bash', '.sql'
+    })
+    
     def __init__(self, project_root: str):
         self.project_root = Path(project_root)
-        self.index: Dict[str, Any] = {}
+        self.index: Dict[str, FileInfo] = {}
         self.file_relationships: Dict[str, Set[str]] = {}
         self.symbols_map: Dict[str, List[str]] = {}  # symbol -> files
+        self._trigram_index: Dict[str, Set[str]] = {}  # trigram -> files
+        self._module_to_file: Dict[str, str] = {}  # dotted Python module -> file
+        # FileInfo.content_key -> (symbols, imports), shared by files with identical contents
+        self._content_by_hash: Dict[str, Tuple[Tuple[Symbol, ...], Tuple[str, ...]]] = {}
+        # Snapshot file the index was last loaded from or saved to, and the file
+        # entries changed (None: removed) since, which save_index can append
+        # to the snapshot's delta log instead of rewriting it
+        self._snapshot_path: Optional[Path] = None
+        self._unsaved_changes: Dict[str, Optional[FileInfo]] = {}
         self.last_indexed = None
-        
-        # Files/dirs to ignore
-        self.ignore_patterns = {
-            '__pycache__', '.git', '.venv', 'venv', 'node_modules',
-            '.env', '.pyc', '.so', '.dylib', '.egg-info', 'dist',
-            'build', '.DS_Store', '.pytest_cache', '.mypy_cache'
-        }
-        
-        self.code_extensions = {
-            '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp',
-            '.c', '.h', '.hpp', '.cs', '.go', '.rs', '.rb', '.php',
-            '.swift', '.kt', '.scala', '.sh', '.bash', '.sql'
-        }
     
     def index_codebase(self) -> Dict[str, Any]:
         """
         Index entire codebase.
+        Files whose mtime and size match the previous index are reused without
+        being re-read or re-parsed.
         Returns summary of indexed files.
         """
         logger.info(f"Indexing codebase at {self.project_root}")
         
+        previous_index = self.index
         self.index = {}
         self.file_relationships = {}
         self.symbols_map = {}
+        self._trigram_index = {}
+        self._module_to_file = {}
+        # Seed from the previous index so copied or renamed files skip parsing
+        self._content_by_hash = {
+            file_info.content_key: (file_info.symbols, file_info.imports)
+            for file_info in previous_index.values()
+        }
+        
+        walked = []
+        pending = []
+        
+        for file_path, relative_path, stat in self._walk_files():
+            file_info = previous_index.get(relative_path)
+            
+            if (file_info is not None
+                    and file_info.mtime_ns == stat.st_mtime_ns
+                    and file_info.size == stat.st_size):
+                walked.append((relative_path, file_info))
+            else:
+                walked.append((relative_path, None))
+                pending.append((file_path, relative_path, stat))
+        
+        reused_count = len(walked) - len(pending)
+        
+        # Changed files are read and parsed concurrently; shared maps are only
+        # touched below, on this thread, in walk order
+        with ThreadPoolExecutor(max_workers=_INDEX_WORKERS) as pool:
+            fresh = dict(zip(
+                (relative_path for _, relative_path, _ in pending),
+                pool.map(self._try_index_file, pending)
+            ))
         
         indexed_count = 0
+        for relative_path, file_info in walked:
+            if file_info is None:
+                file_info = fresh[relative_path]
+                if file_info is None:
+                    continue
+                self._unsaved_changes[relative_path] = file_info
+            
+            self._add_to_index(relative_path, file_info)
+            indexed_count += 1
         
-        for file_path in self._walk_files():
-            try:
-                self._index_file(file_path)
-                indexed_count += 1
-            except Exception as e:
-                logger.warning(f"Failed to index {file_path}: {e}")
+        # Deleted files, and files that could no longer be indexed
+        for relative_path in previous_index.keys() - self.index.keys():
+            self._unsaved_changes[relative_path] = None
         
         self.last_indexed = datetime.now()
         
-        logger.info(f"Indexed {indexed_count} files")
+        logger.info(f"Indexed {indexed_count} files ({reused_count} unchanged)")
         
         return {
             'total_files': indexed_count,
@@ -70,136 +288,287 @@ class CodebaseIndexer:
             'last_indexed': self.last_indexed.isoformat()
         }
     
+    def _is_ignored(self, name: str) -> bool:
+        """Check a file or directory name against the ignore patterns (names or suffixes)."""
+        return name in self.ignore_patterns or os.path.splitext(name)[1] in self.ignore_patterns
+    
     def _walk_files(self):
-        """Walk through all code files in project."""
-        for root, dirs, files in os.walk(self.project_root):
-            # Filter out ignored directories
-            dirs[:] = [d for d in dirs if d not in self.ignore_patterns]
-            
-            root_path = Path(root)
+        """
+        Walk through all code files in project.
+        Yields (path, relative_path, stat) for each file, pruning ignored directories
+        before descending into them.
+        """
+        stack = [("", str(self.project_root))]
+        
+        while stack:
+            relative_dir, directory = stack.pop()
+            try:
+                entries = os.scandir(directory)
+            except OSError as e:
+                logger.warning(f"Could not list {directory}: {e}")
+                continue
             
-            for file in files:
-                file_path = root_path / file
-                
-                # Skip ignored patterns
-                if any(pattern in str(file_path) for pattern in self.ignore_patterns):
-                    continue
-                
-                # Only index code files
-                if file_path.suffix in self.code_extensions:
-                    yield file_path
+            with entries:
+                for entry in entries:
+                    if self._is_ignored(entry.name):
+                        continue
+                    
+                    # Paths are repeated across the index, symbol and relationship maps;
+                    # interning keeps one copy of each
+                    relative_path = sys.intern(
+                        os.path.join(relative_dir, entry.name) if relative_dir else entry.name
+                    )
+                    
+                    # DirEntry caches the file type, so these checks don't stat again
+                    if entry.is_dir():
+                        # Like os.walk, don't follow directory symlinks
+                        if not entry.is_symlink():
+                            stack.append((relative_path, entry.path))
+                    elif entry.is_file() and os.path.splitext(entry.name)[1] in self.code_extensions:
+                        try:
+                            yield entry.path, relative_path, entry.stat()
+                        except OSError as e:
+                            logger.warning(f"Could not stat {entry.path}: {e}")
     
-    def _index_file(self, file_path: Path):
-        """Index a single file."""
-        relative_path = str(file_path.relative_to(self.project_root))
-        
+    def _try_index_file(self, args) -> Optional[FileInfo]:
+        """Run _index_file for a (path, relative_path, stat) tuple, logging failures."""
+        file_path, relative_path, stat = args
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            return self._index_file(file_path, relative_path, stat)
+        except Exception as e:
+            logger.warning(f"Failed to index {file_path}: {e}")
+            return None
+    
+    def _index_file(self, file_path: str, relative_path: str, stat: os.stat_result) -> Optional[FileInfo]:
+        """Read and analyze a single file, returning its index entry."""
+        try:
+            with open(file_path, 'rb') as f:
+                data = f.read()
         except Exception as e:
             logger.warning(f"Could not read {file_path}: {e}")
-            return
-        
-        # Create file entry
-        file_info = {
-            'path': relative_path,
-            'size': len(content),
-            'lines': content.count('\n') + 1,
-            'language': self._detect_language(file_path),
-            'hash': hashlib.md5(content.encode()).hexdigest(),
-            'modified': datetime.fromtimestamp(file_path.stat().st_mtime).isoformat()
-        }
+            return None
+        
+        extension = os.path.splitext(file_path)[1]
+        language = self._detect_language(extension)
+        content_hash = _fingerprint(data)
+        content_key = f"{language}:{content_hash}"
+        
+        # Files with identical contents share one parsed (symbols, imports) pair
+        content = self._content_by_hash.get(content_key)
+        if content is None:
+            # Extract symbols (functions, classes, etc.) and imports/dependencies
+            symbols = []
+            if extension == '.py':
+                symbols, imports = self._extract_python_info(data, relative_path)
+            else:
+                imports = self._extract_imports(data, extension)
+            content = self._content_by_hash.setdefault(content_key, (tuple(symbols), tuple(imports)))
+        
+        return FileInfo(
+            path=relative_path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            lines=data.count(b'\n') + 1,
+            language=language,
+            hash=content_hash,
+            modified=datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            symbols=content[0],
+            imports=content[1]
+        )
+    
+    def _add_to_index(self, relative_path: str, file_info: FileInfo) -> None:
+        """Add a file entry to the index and its symbol/relationship maps."""
+        # Build symbol map
+        for symbol in file_info.symbols:
+            symbol_name = symbol.name
+            if symbol_name not in self.symbols_map:
+                self.symbols_map[symbol_name] = []
+            self.symbols_map[symbol_name].append(relative_path)
         
-        # Extract symbols (functions, classes, etc.)
-        if file_path.suffix == '.py':
-            symbols = self._extract_python_symbols(content, relative_path)
-            file_info['symbols'] = symbols
-            
-            # Build symbol map
-            for symbol in symbols:
-                symbol_name = symbol['name']
-                if symbol_name not in self.symbols_map:
-                    self.symbols_map[symbol_name] = []
-                self.symbols_map[symbol_name].append(relative_path)
+        # Build file relationships
+        self.file_relationships[relative_path] = set(file_info.imports)
         
-        # Extract imports/dependencies
-        imports = self._extract_imports(content, file_path.suffix)
-        file_info['imports'] = imports
+        # Build search index
+        self._add_trigrams(relative_path, file_info)
         
-        # Build file relationships
-        self.file_relationships[relative_path] = set(imports)
+        self._register_module(relative_path)
         
         self.index[relative_path] = file_info
     
-    def _detect_language(self, file_path: Path) -> str:
+    @staticmethod
+    def _module_name(relative_path: str) -> Optional[str]:
+        """Get the dotted module name of a Python file (packages map to their __init__.py)."""
+        path = Path(relative_path)
+        if path.suffix != '.py':
+            return None
+        
+        parts = path.with_suffix('').parts
+        if parts[-1] == '__init__':
+            parts = parts[:-1]
+        return '.'.join(parts) if parts else None
+    
+    def _register_module(self, relative_path: str) -> None:
+        """Make a Python file resolvable by its module name in get_related_files."""
+        module = self._module_name(relative_path)
+        if module:
+            self._module_to_file[module] = relative_path
+    
+    def _resolve_import(self, importer: str, name: str) -> Optional[str]:
+        """Resolve an import recorded in importer to an indexed file, if it is one."""
+        if name.startswith('.'):
+            # Relative import: climb from the importing module's package
+            level = len(name) - len(name.lstrip('.'))
+            package = Path(importer).parent.parts
+            if level - 1 > len(package):
+                return None
+            package = package[:len(package) - (level - 1)]
+            name = '.'.join(package + tuple(filter(None, name[level:].split('.'))))
+        
+        return self._module_to_file.get(name)
+    
+    def _add_trigrams(self, relative_path: str, file_info: FileInfo) -> None:
+        """Add a file to the trigram posting lists used by search_codebase."""
+        for trigram in self._file_trigrams(relative_path, file_info):
+            postings = self._trigram_index.get(trigram)
+            if postings is None:
+                self._trigram_index[trigram] = postings = set()
+            postings.add(relative_path)
+    
+    @staticmethod
+    def _trigrams(text: str) -> Set[str]:
+        """Get the set of 3-character substrings of text."""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+    
+    def _file_trigrams(self, relative_path: str, file_info: FileInfo) -> Set[str]:
+        """Get trigrams for everything search_codebase matches against in a file."""
+        trigrams = self._trigrams(relative_path.lower())
+        for symbol in file_info.symbols:
+            trigrams |= self._trigrams(symbol.name.lower())
+            if symbol.docstring:
+                trigrams |= self._trigrams(symbol.docstring.lower())
+        return trigrams
+    
+    def _rebuild_trigram_index(self) -> None:
+        """Rebuild the search index from the current file index."""
+        self._trigram_index = {}
+        for relative_path, file_info in self.index.items():
+            self._add_trigrams(relative_path, file_info)
+    
+    def _detect_language(self, extension: str) -> str:
         """Detect programming language from file extension."""
-        ext_map = {
-            '.py': 'python',
-            '.js': 'javascript',
-            '.ts': 'typescript',
-            '.jsx': 'javascript',
-            '.tsx': 'typescript',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.rb': 'ruby',
-            '.php': 'php',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.sh': 'bash'
-        }
-        return ext_map.get(file_path.suffix, 'unknown')
+        return _EXT_MAP.get(extension, 'unknown')
     
-    def _extract_python_symbols(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Extract functions and classes from Python code."""
+    def _extract_python_info(self, source: bytes, filename: str = '<unknown>') -> Tuple[List[Symbol], List[str]]:
+        """Extract functions, classes and imports from Python code in a single pass."""
+        if _TS_PYTHON is not None:
+            return self._extract_python_info_ts(source)
+        
         symbols = []
+        imports = []
         
+        # Parsing the raw bytes skips a decode and honours PEP 263 encoding declarations
         try:
-            tree = ast.parse(content)
+            tree = compile(source, filename, 'exec', flags=ast.PyCF_ONLY_AST, dont_inherit=True)
+        except (SyntaxError, ValueError):
+            return symbols, imports
+        
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                symbols.append(Symbol('function', sys.intern(node.name), node.lineno, self._docstring_summary(node)))
+            elif isinstance(node, ast.ClassDef):
+                symbols.append(Symbol('class', sys.intern(node.name), node.lineno, self._docstring_summary(node)))
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    imports.append(sys.intern(alias.name))
+            elif isinstance(node, ast.ImportFrom):
+                # Keep the leading dots of relative imports so they can be resolved
+                module = '.' * node.level + (node.module or '')
+                if module:
+                    imports.append(sys.intern(module))
+        
+        return symbols, imports
+    
+    def _extract_python_info_ts(self, source: bytes) -> Tuple[List[Symbol], List[str]]:
+        """Extract functions, classes and imports from Python code with tree-sitter."""
+        symbols = []
+        imports = []
+        
+        # Breadth-first like ast.walk; tree-sitter recovers from syntax errors
+        # instead of failing, so broken files still yield their symbols
+        todo = deque([_ts_parser().parse(source).root_node])
+        while todo:
+            node = todo.popleft()
+            kind = node.type
             
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    symbols.append({
-                        'type': 'function',
-                        'name': node.name,
-                        'line': node.lineno,
-                        'docstring': ast.get_docstring(node)
-                    })
-                elif isinstance(node, ast.ClassDef):
-                    symbols.append({
-                        'type': 'class',
-                        'name': node.name,
-                        'line': node.lineno,
-                        'docstring': ast.get_docstring(node)
-                    })
-        except SyntaxError:
-            pass
-        
-        return symbols
-    
-    def _extract_imports(self, content: str, extension: str) -> List[str]:
-        """Extract imports/dependencies from code."""
+            if kind == 'function_definition' or kind == 'class_definition':
+                name = node.child_by_field_name('name')
+                if name is not None:
+                    symbols.append(Symbol(
+                        'function' if kind == 'function_definition' else 'class',
+                        sys.intern(_ts_text(name)),
+                        node.start_point[0] + 1,
+                        self._ts_docstring_summary(node)
+                    ))
+            elif kind == 'import_statement':
+                for name in node.children_by_field_name('name'):
+                    if name.type == 'aliased_import':
+                        name = name.child_by_field_name('name')
+                    imports.append(sys.intern(_ts_text(name)))
+                continue
+            elif kind == 'import_from_statement':
+                # relative_import nodes keep their leading dots, matching the ast path
+                module = node.child_by_field_name('module_name')
+                if module is not None:
+                    imports.append(sys.intern(_ts_text(module)))
+                continue
+            elif kind == 'future_import_statement':
+                imports.append('__future__')
+                continue
+            
+            todo.extend(node.children)
+        
+        return symbols, imports
+    
+    @staticmethod
+    def _docstring_summary(node: ast.AST) -> Optional[str]:
+        """Get the leading part of a node's docstring, if it has one."""
+        docstring = ast.get_docstring(node)
+        return docstring[:_DOCSTRING_SUMMARY_CHARS] if docstring else None
+    
+    @staticmethod
+    def _ts_docstring_summary(node) -> Optional[str]:
+        """Get the leading part of a tree-sitter definition's docstring, as ast.get_docstring would."""
+        body = node.child_by_field_name('body')
+        if body is None:
+            return None
+        
+        first = next((child for child in body.named_children if child.type != 'comment'), None)
+        if first is None or first.type != 'expression_statement' or not first.named_children:
+            return None
+        
+        literal = first.named_children[0]
+        if literal.type not in ('string', 'concatenated_string'):
+            return None
+        try:
+            docstring = ast.literal_eval(literal.text.decode('utf-8', errors='replace'))
+        except (SyntaxError, ValueError):
+            # f-strings aren't docstrings
+            return None
+        if not isinstance(docstring, str):
+            return None
+        
+        docstring = inspect.cleandoc(docstring)
+        return docstring[:_DOCSTRING_SUMMARY_CHARS] if docstring else None
+    
+    def _extract_imports(self, data: bytes, extension: str) -> List[str]:
+        """Extract imports/dependencies from raw file contents."""
         imports = []
         
         if extension == '.py':
-            try:
-                tree = ast.parse(content)
-                for node in ast.walk(tree):
-                    if isinstance(node, ast.Import):
-                        for alias in node.names:
-                            imports.append(alias.name)
-                    elif isinstance(node, ast.ImportFrom):
-                        if node.module:
-                            imports.append(node.module)
-            except SyntaxError:
-                pass
+            _, imports = self._extract_python_info(data)
         elif extension in ['.js', '.ts', '.jsx', '.tsx']:
             # Simple regex-based extraction for JS/TS
-            import re
-            import_pattern = r'import\s+.*?\s+from\s+[\'"](.+?)[\'"]'
-            imports = re.findall(import_pattern, content)
+            imports = [sys.intern(m.decode('utf-8', errors='replace')) for m in _JS_IMPORT_RE.findall(data)]
         
         return imports
     
@@ -207,11 +576,11 @@ class CodebaseIndexer:
         """Get statistics about languages in codebase."""
         stats = {}
         for file_info in self.index.values():
-            lang = file_info['language']
+            lang = file_info.language
             stats[lang] = stats.get(lang, 0) + 1
         return stats
     
-    def get_file_info(self, file_path: str) -> Optional[Dict[str, Any]]:
+    def get_file_info(self, file_path: str) -> Optional[FileInfo]:
         """Get information about a specific file."""
         return self.index.get(file_path)
     
@@ -221,30 +590,29 @@ class CodebaseIndexer:
     
     def get_related_files(self, file_path: str, depth: int = 2) -> Set[str]:
         """
-        Get files related to the given file through imports.
+        Get indexed files related to the given file through imports.
         depth controls how many levels of relationships to traverse.
         """
         if file_path not in self.file_relationships:
             return set()
         
         related = set()
-        to_explore = {file_path}
-        explored = set()
-        
-        for _ in range(depth):
-            next_level = set()
-            for current_file in to_explore:
-                if current_file in explored:
-                    continue
-                explored.add(current_file)
-                
-                # Add direct imports
-                if current_file in self.file_relationships:
-                    imports = self.file_relationships[current_file]
-                    related.update(imports)
-                    next_level.update(imports)
+        visited = {file_path}
+        frontier = deque([(file_path, 0)])
+        
+        # Breadth-first, so once the depth limit is reached every remaining entry is at it
+        while frontier:
+            current_file, level = frontier.popleft()
+            if level >= depth:
+                break
             
-            to_explore = next_level
+            for name in self.file_relationships.get(current_file, ()):
+                target = self._resolve_import(current_file, name)
+                if target is None or target in visited:
+                    continue
+                visited.add(target)
+                related.add(target)
+                frontier.append((target, level + 1))
         
         return related
     
@@ -256,8 +624,9 @@ class CodebaseIndexer:
         results = []
         query_lower = query.lower()
         
-        # Search in file paths
-        for file_path, file_info in self.index.items():
+        # Only files containing every trigram of the query can match; score those
+        for file_path in self._search_candidates(query_lower):
+            file_info = self.index[file_path]
             score = 0
             
             # Match in file path
@@ -265,12 +634,11 @@ class CodebaseIndexer:
                 score += 10
             
             # Match in symbols
-            if 'symbols' in file_info:
-                for symbol in file_info['symbols']:
-                    if query_lower in symbol['name'].lower():
-                        score += 5
-                    if symbol.get('docstring') and query_lower in symbol['docstring'].lower():
-                        score += 2
+            for symbol in file_info.symbols:
+                if query_lower in symbol.name.lower():
+                    score += 5
+                if symbol.docstring and query_lower in symbol.docstring.lower():
+                    score += 2
             
             if score > 0:
                 results.append({
@@ -279,9 +647,23 @@ class CodebaseIndexer:
                     'info': file_info
                 })
         
-        # Sort by score and limit
-        results.sort(key=lambda x: x['score'], reverse=True)
-        return results[:limit]
+        # Top results by score; nlargest keeps ties in candidate order like a stable sort
+        return heapq.nlargest(limit, results, key=lambda x: x['score'])
+    
+    def _search_candidates(self, query_lower: str) -> List[str]:
+        """Narrow a search to files whose indexed text contains all of the query's trigrams."""
+        if len(query_lower) < 3:
+            return list(self.index)
+        
+        postings = []
+        for trigram in self._trigrams(query_lower):
+            files = self._trigram_index.get(trigram)
+            if not files:
+                return []
+            postings.append(files)
+        
+        postings.sort(key=len)
+        return sorted(postings[0].intersection(*postings[1:]))
     
     def get_project_summary(self) -> str:
         """Get a summary of the project for AI context."""
@@ -289,7 +671,7 @@ class CodebaseIndexer:
             return "Project not indexed yet."
         
         total_files = len(self.index)
-        total_lines = sum(f['lines'] for f in self.index.values())
+        total_lines = sum(f.lines for f in self.index.values())
         lang_stats = self._get_language_stats()
         
         summary = f"""Project Structure:
@@ -304,12 +686,12 @@ Key files identified:
         # Add top 5 largest files
         largest_files = sorted(
             self.index.items(),
-            key=lambda x: x[1]['lines'],
+            key=lambda x: x[1].lines,
             reverse=True
         )[:5]
         
         for file_path, info in largest_files:
-            summary += f"- {file_path} ({info['lines']} lines, {info['language']})\n"
+            summary += f"- {file_path} ({info.lines} lines, {info.language})\n"
         
         return summary
     
@@ -320,18 +702,18 @@ Key files identified:
         
         file_info = self.index[file_path]
         context = f"\nFile: {file_path}\n"
-        context += f"Language: {file_info['language']}\n"
-        context += f"Lines: {file_info['lines']}\n"
+        context += f"Language: {file_info.language}\n"
+        context += f"Lines: {file_info.lines}\n"
         
         # Add symbols
-        if 'symbols' in file_info and file_info['symbols']:
+        if file_info.symbols:
             context += "\nSymbols defined:\n"
-            for symbol in file_info['symbols'][:10]:  # Limit to 10
-                context += f"- {symbol['type']} {symbol['name']} (line {symbol['line']})\n"
+            for symbol in file_info.symbols[:10]:  # Limit to 10
+                context += f"- {symbol.type} {symbol.name} (line {symbol.line})\n"
         
         # Add imports
-        if file_info['imports']:
-            context += f"\nImports: {', '.join(file_info['imports'][:10])}\n"
+        if file_info.imports:
+            context += f"\nImports: {', '.join(file_info.imports[:10])}\n"
         
         # Add related files
         related = self.get_related_files(file_path, depth=1)
@@ -360,20 +742,103 @@ Key files identified:
         return context
     
     def save_index(self, output_file: str = ".codebase_index.json"):
-        """Save index to file for faster loading."""
+        """
+        Save index to file for faster loading. If the file holds the snapshot
+        this index was loaded from or last saved to, only the files changed
+        since are appended to its delta log, until the log grows large enough
+        that a fresh snapshot is cheaper to load.
+        """
+        output_path = self.project_root / output_file
+        log_path = self._delta_log_path(output_file)
+        if (output_path == self._snapshot_path and output_path.exists()
+                and (not log_path.exists()
+                     or log_path.stat().st_size <= output_path.stat().st_size * _DELTA_LOG_COMPACT_RATIO)):
+            for relative_path, file_info in self._unsaved_changes.items():
+                self.append_index_delta(relative_path, file_info, output_file)
+            logger.info(f"Appended {len(self._unsaved_changes)} changed files to {log_path}")
+            self._unsaved_changes = {}
+            return
+        
+        # Symbols and imports are written once per distinct file contents
+        contents = {}
+        for file_info in self.index.values():
+            if file_info.content_key not in contents:
+                contents[file_info.content_key] = file_info.content_to_dict()
+        
         index_data = {
-            'index': self.index,
-            'file_relationships': {k: list(v) for k, v in self.file_relationships.items()},
+            'index': {k: v.to_dict(include_content=False) for k, v in self.index.items()},
+            'contents': contents,
+            'file_relationships': self.file_relationships,
             'symbols_map': self.symbols_map,
+            # The trigram index isn't saved: it is cheap to rebuild on load
             'last_indexed': self.last_indexed.isoformat() if self.last_indexed else None
         }
         
-        output_path = self.project_root / output_file
-        with open(output_path, 'w') as f:
-            json.dump(index_data, f, indent=2)
+        output_path.write_bytes(_dump_index(index_data))
+        
+        # The snapshot now includes every logged change
+        if log_path.exists():
+            log_path.unlink()
+        self._snapshot_path = output_path
+        self._unsaved_changes = {}
         
         logger.info(f"Index saved to {output_path}")
     
+    def _delta_log_path(self, index_file: str) -> Path:
+        """Get the delta log that accompanies an index snapshot."""
+        return self.project_root / Path(index_file).with_suffix('.log')
+    
+    def append_index_delta(self, relative_path: str, file_info: Optional[FileInfo],
+                           index_file: str = ".codebase_index.json") -> None:
+        """
+        Record a changed file entry (or a removed file, when file_info is None)
+        without rewriting the whole index. load_index replays these records on
+        top of the last snapshot saved by save_index.
+        """
+        record = {
+            'path': relative_path,
+            'info': file_info.to_dict() if file_info is not None else None
+        }
+        
+        with open(self._delta_log_path(index_file), 'ab') as f:
+            f.write(_dump_index(record, indent=False) + b'\n')
+    
+    def _replay_delta_log(self, log_path: Path) -> int:
+        """Apply the records of a delta log to the loaded index, returning how many were applied."""
+        applied = 0
+        
+        with open(log_path, 'rb') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = _load_index(line)
+                except ValueError:
+                    # A write interrupted part-way leaves a truncated last record
+                    logger.warning(f"Ignoring unreadable record in {log_path}")
+                    break
+                
+                relative_path = sys.intern(record['path'])
+                if record['info'] is None:
+                    self.index.pop(relative_path, None)
+                else:
+                    self.index[relative_path] = FileInfo.from_dict(record['info'])
+                applied += 1
+        
+        return applied
+    
+    def _rebuild_maps(self) -> None:
+        """Rebuild the symbol, relationship, search and module maps from the file index."""
+        index = self.index
+        self.index = {}
+        self.file_relationships = {}
+        self.symbols_map = {}
+        self._trigram_index = {}
+        self._module_to_file = {}
+        
+        for relative_path, file_info in index.items():
+            self._add_to_index(relative_path, file_info)
+    
     def load_index(self, input_file: str = ".codebase_index.json") -> bool:
         """Load index from file."""
         input_path = self.project_root / input_file
@@ -382,13 +847,43 @@ Key files identified:
             return False
         
         try:
-            with open(input_path, 'r') as f:
-                index_data = json.load(f)
+            index_data = _load_index(input_path.read_bytes())
             
-            self.index = index_data['index']
-            self.file_relationships = {k: set(v) for k, v in index_data['file_relationships'].items()}
-            self.symbols_map = index_data['symbols_map']
+            # Re-intern repeated paths and names so they share storage as after indexing
+            intern = sys.intern
+            self._content_by_hash = {
+                key: FileInfo.content_from_dict(content)
+                for key, content in index_data.get('contents', {}).items()
+            }
+            self.index = {
+                intern(k): FileInfo.from_dict(v, self._content_by_hash.get(f"{v['language']}:{v['hash']}"))
+                for k, v in index_data['index'].items()
+            }
+            self.file_relationships = {
+                intern(k): {intern(name) for name in v}
+                for k, v in index_data['file_relationships'].items()
+            }
+            self.symbols_map = {
+                intern(k): [intern(path) for path in v]
+                for k, v in index_data['symbols_map'].items()
+            }
+            self._module_to_file = {}
+            for relative_path in self.index:
+                self._register_module(relative_path)
             self.last_indexed = datetime.fromisoformat(index_data['last_indexed']) if index_data['last_indexed'] else None
+            self._snapshot_path = input_path
+            self._unsaved_changes = {}
+            
+            # Overlay changes recorded since the snapshot was written; rebuilding
+            # the maps then also rebuilds the trigram index
+            log_path = self._delta_log_path(input_file)
+            if log_path.exists() and self._replay_delta_log(log_path):
+                self._rebuild_maps()
+            else:
+                self._rebuild_trigram_index()
+            
+            if log_path.exists() and log_path.stat().st_size > input_path.stat().st_size * _DELTA_LOG_COMPACT_RATIO:
+                self.save_index(input_file)
             
             logger.info(f"Index loaded from {input_path}")
             return True
@@ -1,14 +1,47 @@
 """Session manager for maintaining context across interactions."""
 
+import asyncio
+import itertools
 import json
 import os
-from typing import Dict, List, Optional, Any
+import re
+import threading
+from collections import deque
+from dataclasses import asdict
+from itertools import islice
+from typing import Deque, Dict, List, Optional, Any, Set
 from datetime import datetime, timedelta
-from ..core.models import UserIntent, SessionState, AgentResponse
+from ..core.models import UserIntent, SessionState, AgentResponse, CodeEdit
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Function/class names mentioned in a user request
+_FUNC_RE = re.compile(r'(?:function|def)\s+(\w+)', re.IGNORECASE)
+_CLASS_RE = re.compile(r'class\s+(\w+)', re.IGNORECASE)
+
+# How many edits and execution results a session remembers
+_MAX_RECENT_EDITS = 20
+_MAX_EXECUTION_HISTORY = 10
+
+# save_session calls arriving within this many seconds are coalesced into one write
+_SAVE_DEBOUNCE_SECONDS = 0.5
+
+# Session files are rewritten often, so use orjson when it is installed
+try:
+    import orjson
+    
+    def _dump_session(data: Dict[str, Any]) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dump_session(data: Dict[str, Any]) -> bytes:
+        return json.dumps(data, indent=2).encode('utf-8')
+
+
+def _tail(items: Deque[Any], n: int) -> List[Any]:
+    """Get the last n items of a deque as a list (deques don't support slicing)."""
+    return list(islice(items, max(len(items) - n, 0), None))
+
 
 class SessionManager:
     """Manages session state and context for multi-turn conversations."""
@@ -20,9 +53,23 @@ class SessionManager:
             session_id=self._generate_session_id(),
             project_root=project_root
         )
-        self.conversation_history = []
+        # Bounded deques drop their oldest entry on append
+        self.session_state.recent_edits = deque(maxlen=_MAX_RECENT_EDITS)
+        self.session_state.execution_history = deque(maxlen=_MAX_EXECUTION_HISTORY)
+        self.conversation_history: Deque[Dict[str, Any]] = deque(maxlen=max_context_length)
         self.context_memory = {}
+        # Serialized forms of recent_edits/execution_history, kept in step with them
+        # so edits and results are only converted to dicts once
+        self._recent_edits_serialized: Deque[Dict[str, Any]] = deque(maxlen=_MAX_RECENT_EDITS)
+        self._execution_history_serialized: Deque[Dict[str, Any]] = deque(maxlen=_MAX_EXECUTION_HISTORY)
+        # Membership set for session_state.current_files, which has to stay an ordered list
+        self._current_files_set: Set[str] = set()
         self.session_file = os.path.join(project_root, ".coding_agent_session.json")
+        # Debounced saving: the pending save task, and ordering for writes done in threads
+        self._save_pending: Optional[asyncio.Task] = None
+        self._save_counter = itertools.count(1)
+        self._saved_seq = 0
+        self._write_lock = threading.Lock()
         self._load_session()
     
     def _generate_session_id(self) -> str:
@@ -38,9 +85,11 @@ class SessionManager:
                 
                 # Restore session state
                 self.session_state.current_files = data.get("current_files", [])
-                self.session_state.recent_edits = data.get("recent_edits", [])
+                self._current_files_set = set(self.session_state.current_files)
+                self._recent_edits_serialized.extend(data.get("recent_edits", []))
+                self.session_state.recent_edits.extend(CodeEdit(**edit) for edit in self._recent_edits_serialized)
                 self.session_state.context_memory = data.get("context_memory", {})
-                self.conversation_history = data.get("conversation_history", [])
+                self.conversation_history.extend(data.get("conversation_history", []))
                 
                 logger.info(f"Loaded existing session: {self.session_state.session_id}")
             else:
@@ -50,31 +99,62 @@ class SessionManager:
             logger.error(f"Failed to load session: {e}")
     
     async def save_session(self) -> None:
-        """Save current session to file."""
+        """
+        Schedule a save of the current session.
+        Calls made within the debounce window are coalesced into a single write;
+        use flush_session to write immediately.
+        """
+        if self._save_pending is not None and not self._save_pending.done():
+            self._save_pending.cancel()
+        self._save_pending = asyncio.ensure_future(self._debounced_save())
+    
+    async def flush_session(self) -> None:
+        """Save the current session now, replacing any pending debounced save."""
+        if self._save_pending is not None and not self._save_pending.done():
+            self._save_pending.cancel()
+        self._save_pending = None
+        await self._write_session()
+    
+    async def _debounced_save(self) -> None:
+        """Wait out the debounce window, then write the session."""
+        await asyncio.sleep(_SAVE_DEBOUNCE_SECONDS)
+        await self._write_session()
+    
+    async def _write_session(self) -> None:
+        """Snapshot the session on the event loop and encode/write it in a worker thread."""
         try:
             session_data = {
                 "session_id": self.session_state.session_id,
                 "project_root": self.session_state.project_root,
-                "current_files": self.session_state.current_files,
-                "recent_edits": [edit.dict() for edit in self.session_state.recent_edits],
-                "execution_history": [result.dict() for result in self.session_state.execution_history],
-                "context_memory": self.session_state.context_memory,
-                "conversation_history": self.conversation_history,
+                "current_files": list(self.session_state.current_files),
+                "recent_edits": list(self._recent_edits_serialized),
+                "execution_history": list(self._execution_history_serialized),
+                "context_memory": dict(self.session_state.context_memory),
+                "conversation_history": list(self.conversation_history),
                 "created_at": self.session_state.created_at.isoformat(),
                 "last_activity": datetime.now().isoformat()
             }
             
-            with open(self.session_file, 'w') as f:
-                json.dump(session_data, f, indent=2)
+            loop = asyncio.get_event_loop()
+            await loop.run_in_executor(None, self._write_session_file, next(self._save_counter), session_data)
             
             logger.info("Session saved successfully")
             
         except Exception as e:
             logger.error(f"Failed to save session: {e}")
     
+    def _write_session_file(self, seq: int, session_data: Dict[str, Any]) -> None:
+        """Write a session snapshot unless a newer one has already been written."""
+        with self._write_lock:
+            if seq < self._saved_seq:
+                return
+            with open(self.session_file, 'wb') as f:
+                f.write(_dump_session(session_data))
+            self._saved_seq = seq
+    
     def update_context(self, intent: UserIntent, user_input: str) -> None:
         """Update session context with new intent and user input."""
-        # Add to conversation history
+        # Add to conversation history (only the most recent turns are kept)
         self.conversation_history.append({
             "timestamp": datetime.now().isoformat(),
             "user_input": user_input,
@@ -83,20 +163,15 @@ class SessionManager:
             "parameters": intent.parameters
         })
         
-        # Keep only recent history
-        if len(self.conversation_history) > self.max_context_length:
-            self.conversation_history = self.conversation_history[-self.max_context_length:]
-        
         # Update recent edits
         if intent.code_edits:
             self.session_state.recent_edits.extend(intent.code_edits)
-            # Keep only recent edits
-            if len(self.session_state.recent_edits) > 20:
-                self.session_state.recent_edits = self.session_state.recent_edits[-20:]
+            self._recent_edits_serialized.extend(asdict(edit) for edit in intent.code_edits)
         
         # Update current files
         for file_path in intent.target_files:
-            if file_path not in self.session_state.current_files:
+            if file_path not in self._current_files_set:
+                self._current_files_set.add(file_path)
                 self.session_state.current_files.append(file_path)
         
         # Update context memory
@@ -116,15 +191,13 @@ class SessionManager:
         
         if "function" in user_input.lower():
             # Extract function name if mentioned
-            import re
-            func_match = re.search(r'(?:function|def)\s+(\w+)', user_input, re.IGNORECASE)
+            func_match = _FUNC_RE.search(user_input)
             if func_match:
                 self.context_memory["current_function"] = func_match.group(1)
         
         if "class" in user_input.lower():
             # Extract class name if mentioned
-            import re
-            class_match = re.search(r'class\s+(\w+)', user_input, re.IGNORECASE)
+            class_match = _CLASS_RE.search(user_input)
             if class_match:
                 self.context_memory["current_class"] = class_match.group(1)
         
@@ -138,22 +211,24 @@ class SessionManager:
             "session_id": self.session_state.session_id,
             "project_root": self.session_state.project_root,
             "current_files": self.session_state.current_files,
-            "recent_edits": [edit.dict() for edit in self.session_state.recent_edits[-5:]],
-            "conversation_history": self.conversation_history[-3:],
+            "recent_edits": _tail(self._recent_edits_serialized, 5),
+            "conversation_history": _tail(self.conversation_history, 3),
             "context_memory": self.context_memory,
             "session_duration": str(datetime.now() - self.session_state.created_at)
         }
     
     def get_recent_context(self, turns: int = 3) -> List[Dict[str, Any]]:
         """Get recent conversation context."""
-        return self.conversation_history[-turns:] if self.conversation_history else []
+        return _tail(self.conversation_history, turns)
     
     def clear_context(self) -> None:
         """Clear session context."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         self.context_memory = {}
-        self.session_state.recent_edits = []
+        self.session_state.recent_edits.clear()
+        self._recent_edits_serialized.clear()
         self.session_state.current_files = []
+        self._current_files_set.clear()
         logger.info("Session context cleared")
     
     def get_session_summary(self) -> Dict[str, Any]:
@@ -171,10 +246,9 @@ class SessionManager:
     
     def add_execution_result(self, result) -> None:
         """Add execution result to session history."""
+        # Only the most recent executions are kept
         self.session_state.execution_history.append(result)
-        # Keep only recent executions
-        if len(self.session_state.execution_history) > 10:
-            self.session_state.execution_history = self.session_state.execution_history[-10:]
+        self._execution_history_serialized.append(result.dict())
     
     def get_working_files(self) -> List[str]:
         """Get list of files currently being worked on."""
@@ -183,10 +257,11 @@ class SessionManager:
     def set_working_files(self, files: List[str]) -> None:
         """Set the list of working files."""
         self.session_state.current_files = files.copy()
+        self._current_files_set = set(files)
     
     def get_recent_edits(self, limit: int = 5) -> List[Dict[str, Any]]:
         """Get recent edits with limit."""
-        return [edit.dict() for edit in self.session_state.recent_edits[-limit:]]
+        return _tail(self._recent_edits_serialized, limit)
     
     def is_session_expired(self, max_duration_hours: int = 24) -> bool:
         """Check if session has expired."""
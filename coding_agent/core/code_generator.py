@@ -2,46 +2,136 @@
 
 import os
 import ast
-from typing import Dict, List, Optional, Any, Tuple
-from .models import UserIntent, CodeEdit, Language
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, Optional, Any, Tuple
+from .models import UserIntent, IntentType, CodeEdit, Language
 from ..utils.llm_client import LLMClient
+from ..utils.llm_cache import LLMCache, get_default_cache
 from ..utils.logger import get_logger
 from ..utils.file_manager import FileManager
+from ..utils import json_utils
 
 logger = get_logger(__name__)
 
+# Target files are read and sent to the LLM concurrently; both are I/O-bound
+_FILE_WORKERS = 8
+
+# Intent parameters that may name the function/class a modification targets
+_SYMBOL_PARAMETERS = ("symbol", "function_name", "function", "class_name", "class", "name")
+
+# Lines of surrounding code sent along with a targeted symbol
+_REGION_CONTEXT_LINES = 5
+
+# File extension (without the dot) -> language
+_LANGUAGE_MAP: Mapping[str, Language] = MappingProxyType({
+    'py': Language.PYTHON,
+    'js': Language.JAVASCRIPT,
+    'ts': Language.TYPESCRIPT,
+    'java': Language.JAVA,
+    'cpp': Language.CPP,
+    'cc': Language.CPP,
+    'cxx': Language.CPP,
+    'cs': Language.CSHARP,
+    'rs': Language.RUST,
+    'go': Language.GO,
+    'html': Language.HTML,
+    'css': Language.CSS,
+    'sql': Language.SQL,
+    'sh': Language.BASH,
+    'bash': Language.BASH
+})
+
+# Source skeletons per language; shared by every CodeGenerator
+_CODE_TEMPLATES: Mapping[str, Mapping[str, str]] = MappingProxyType({
+    "python": MappingProxyType({
+        "function": "def {name}({params}):\n    \"\"\"{docstring}\"\"\"\n    {body}\n",
+        "class": "class {name}:\n    \"\"\"{docstring}\"\"\"\n    \n    def __init__(self{params}):\n        {init_body}\n",
+        "main": "if __name__ == \"__main__\":\n    {body}\n",
+        "import": "import {module}\n",
+        "test": "import unittest\n\nclass Test{name}(unittest.TestCase):\n    def test_{method}(self):\n        {body}\n"
+    }),
+    "javascript": MappingProxyType({
+        "function": "function {name}({params}) {{\n    {body}\n}}\n",
+        "class": "class {name} {{\n    constructor({params}) {{\n        {init_body}\n    }}\n}}\n",
+        "async_function": "async function {name}({params}) {{\n    {body}\n}}\n",
+        "arrow_function": "const {name} = ({params}) => {{\n    {body}\n}};\n"
+    }),
+    "typescript": MappingProxyType({
+        "interface": "interface {name} {{\n    {properties}\n}}\n",
+        "type": "type {name} = {{\n    {properties}\n}};\n",
+        "function": "function {name}({params}): {return_type} {{\n    {body}\n}}\n",
+        "class": "class {name} {{\n    {properties}\n    \n    constructor({params}) {{\n        {init_body}\n    }}\n}}\n"
+    })
+})
+
+
+@lru_cache(maxsize=128)
+def _python_syntax_issues(content: str) -> Tuple[Dict[str, Any], ...]:
+    """Parse Python source and report syntax errors; memoized for repeated debug runs on the same code."""
+    try:
+        ast.parse(content)
+    except SyntaxError as e:
+        return ({
+            "type": "syntax_error",
+            "message": str(e),
+            "line": e.lineno,
+            "severity": "error"
+        },)
+    return ()
+
 
 class CodeGenerator:
     """Generates and modifies code based on user intents."""
     
-    def __init__(self, llm_client: LLMClient, file_manager: FileManager):
+    # System prompts are kept byte-identical across calls (per language for
+    # content generation) so the provider can cache them as a prompt prefix
+    _CONTENT_SYSTEM_PROMPT = """You are an expert {language} programmer. Generate production-quality, working code based on the user's request.
+
+CRITICAL RULES:
+- Return ONLY the actual code, nothing else
+- NO markdown formatting (no ```), NO explanations, NO comments about the code
+- Include proper imports, error handling, and documentation within the code
+- Write complete, runnable code that solves the exact problem
+- Follow {language} best practices and conventions
+- Make it production-ready, not just a simple example
+
+Return the raw code file content ONLY."""
+    
+    _MODIFICATIONS_SYSTEM_PROMPT = """You are an expert programmer. Analyze the existing code and generate specific modifications based on the user's request.
+
+Return a JSON array of modifications with this structure:
+[
+    {
+        "line_start": <int>,
+        "line_end": <int>,
+        "content": "<new_content>",
+        "operation": "insert|replace|delete",
+        "description": "<description>"
+    }
+]
+
+If no modifications are needed, return an empty array."""
+    
+    def __init__(self, llm_client: LLMClient, file_manager: FileManager, llm_cache: Optional[LLMCache] = None):
         self.llm_client = llm_client
+        self.llm_cache = llm_cache or get_default_cache()
         self.file_manager = file_manager
         self.code_templates = self._load_code_templates()
+        self._dispatch: Dict[IntentType, Callable[[UserIntent], List[CodeEdit]]] = {
+            IntentType.CREATE_FILE: self._generate_file_creation,
+            IntentType.EDIT_FILE: self._generate_file_edit,
+            IntentType.EXECUTE_CODE: self._generate_execution_wrapper,
+            IntentType.DEBUG_CODE: self._generate_debug_code,
+            IntentType.TEST_CODE: self._generate_test_code,
+            IntentType.REFACTOR_CODE: self._generate_refactor_code
+        }
     
-    def _load_code_templates(self) -> Dict[str, Dict[str, str]]:
+    def _load_code_templates(self) -> Mapping[str, Mapping[str, str]]:
         """Load code templates for different languages and patterns."""
-        return {
-            "python": {
-                "function": "def {name}({params}):\n    \"\"\"{docstring}\"\"\"\n    {body}\n",
-                "class": "class {name}:\n    \"\"\"{docstring}\"\"\"\n    \n    def __init__(self{params}):\n        {init_body}\n",
-                "main": "if __name__ == \"__main__\":\n    {body}\n",
-                "import": "import {module}\n",
-                "test": "import unittest\n\nclass Test{name}(unittest.TestCase):\n    def test_{method}(self):\n        {body}\n"
-            },
-            "javascript": {
-                "function": "function {name}({params}) {{\n    {body}\n}}\n",
-                "class": "class {name} {{\n    constructor({params}) {{\n        {init_body}\n    }}\n}}\n",
-                "async_function": "async function {name}({params}) {{\n    {body}\n}}\n",
-                "arrow_function": "const {name} = ({params}) => {{\n    {body}\n}};\n"
-            },
-            "typescript": {
-                "interface": "interface {name} {{\n    {properties}\n}}\n",
-                "type": "type {name} = {{\n    {properties}\n}};\n",
-                "function": "function {name}({params}): {return_type} {{\n    {body}\n}}\n",
-                "class": "class {name} {{\n    {properties}\n    \n    constructor({params}) {{\n        {init_body}\n    }}\n}}\n"
-            }
-        }
+        return _CODE_TEMPLATES
     
     def generate_code(self, intent: UserIntent) -> List[CodeEdit]:
         """
@@ -55,21 +145,11 @@ class CodeGenerator:
         """
         logger.info(f"Generating code for intent: {intent.intent_type}")
         
-        if intent.intent_type.value == "create_file":
-            return self._generate_file_creation(intent)
-        elif intent.intent_type.value == "edit_file":
-            return self._generate_file_edit(intent)
-        elif intent.intent_type.value == "execute_code":
-            return self._generate_execution_wrapper(intent)
-        elif intent.intent_type.value == "debug_code":
-            return self._generate_debug_code(intent)
-        elif intent.intent_type.value == "test_code":
-            return self._generate_test_code(intent)
-        elif intent.intent_type.value == "refactor_code":
-            return self._generate_refactor_code(intent)
-        else:
+        handler = self._dispatch.get(intent.intent_type)
+        if handler is None:
             logger.warning(f"Unsupported intent type for code generation: {intent.intent_type}")
             return []
+        return handler(intent)
     
     def _generate_file_creation(self, intent: UserIntent) -> List[CodeEdit]:
         """Generate code for file creation."""
@@ -98,32 +178,54 @@ class CodeGenerator:
     
     def _generate_file_edit(self, intent: UserIntent) -> List[CodeEdit]:
         """Generate code edits for file modification."""
-        edits = []
-        
         target_files = intent.target_files
         if not target_files:
             # Try to extract from parameters
             target_files = [intent.parameters.get("target_file", "")]
         
+        # Missing files are skipped when they fail to open
+        named_files = []
         for target_file in target_files:
-            if not target_file or not os.path.exists(target_file):
+            if not target_file:
                 logger.warning(f"Target file not found: {target_file}")
                 continue
-            
-            # Read existing content
-            try:
-                existing_content = self.file_manager.read_file(target_file)
-            except Exception as e:
-                logger.error(f"Failed to read file {target_file}: {e}")
-                continue
-            
-            # Generate modifications using LLM
-            modifications = self._llm_generate_modifications(
+            named_files.append(target_file)
+        
+        # Generate modifications using LLM
+        return self._map_target_files(
+            named_files,
+            lambda target_file, existing_content: self._llm_generate_modifications(
                 intent, existing_content, target_file
             )
-            
-            edits.extend(modifications)
+        )
+    
+    def _map_target_files(self, target_files: List[str],
+                          build_edits: Callable[[str, str], List[CodeEdit]]) -> List[CodeEdit]:
+        """
+        Read each target file and call build_edits(target_file, existing_content),
+        processing files concurrently. Files that can't be read are logged and
+        skipped; edits are returned in target file order.
+        """
+        def process(target_file: str) -> List[CodeEdit]:
+            try:
+                existing_content = self.file_manager.read_file(target_file)
+            except FileNotFoundError:
+                logger.warning(f"Target file not found: {target_file}")
+                return []
+            except Exception:
+                # Already logged by read_file
+                return []
+            return build_edits(target_file, existing_content)
+        
+        if len(target_files) <= 1:
+            results = [process(target_file) for target_file in target_files]
+        else:
+            with ThreadPoolExecutor(max_workers=min(_FILE_WORKERS, len(target_files))) as pool:
+                results = list(pool.map(process, target_files))
         
+        edits = []
+        for file_edits in results:
+            edits.extend(file_edits)
         return edits
     
     def _generate_execution_wrapper(self, intent: UserIntent) -> List[CodeEdit]:
@@ -144,101 +246,52 @@ class CodeGenerator:
     
     def _generate_debug_code(self, intent: UserIntent) -> List[CodeEdit]:
         """Generate debugging code."""
-        edits = []
-        
-        target_files = intent.target_files
-        if not target_files:
-            return edits
-        
-        for target_file in target_files:
-            try:
-                existing_content = self.file_manager.read_file(target_file)
-            except Exception as e:
-                logger.error(f"Failed to read file {target_file}: {e}")
-                continue
-            
+        def build_fixes(target_file: str, existing_content: str) -> List[CodeEdit]:
             # Analyze code for potential issues
             issues = self._analyze_code_issues(existing_content, target_file)
             
             # Generate fixes
-            fixes = self._llm_generate_debug_fixes(intent, existing_content, issues)
-            
-            edits.extend(fixes)
+            return self._llm_generate_debug_fixes(intent, existing_content, issues)
         
-        return edits
+        return self._map_target_files(intent.target_files, build_fixes)
     
     def _generate_test_code(self, intent: UserIntent) -> List[CodeEdit]:
         """Generate test code."""
-        edits = []
-        
-        target_files = intent.target_files
-        if not target_files:
-            return edits
-        
-        for target_file in target_files:
-            try:
-                existing_content = self.file_manager.read_file(target_file)
-            except Exception as e:
-                logger.error(f"Failed to read file {target_file}: {e}")
-                continue
-            
+        def build_tests(target_file: str, existing_content: str) -> List[CodeEdit]:
             # Generate test file name
             test_file = self._generate_test_filename(target_file)
             
             # Generate test content
             test_content = self._llm_generate_test_content(intent, existing_content, target_file)
             
-            edits.append(CodeEdit(
+            return [CodeEdit(
                 file_path=test_file,
                 content=test_content,
                 operation="create",
                 description=f"Generate tests for {target_file}"
-            ))
+            )]
         
-        return edits
+        return self._map_target_files(intent.target_files, build_tests)
     
     def _generate_refactor_code(self, intent: UserIntent) -> List[CodeEdit]:
         """Generate refactored code."""
-        edits = []
-        
-        target_files = intent.target_files
-        if not target_files:
-            return edits
-        
-        for target_file in target_files:
-            try:
-                existing_content = self.file_manager.read_file(target_file)
-            except Exception as e:
-                logger.error(f"Failed to read file {target_file}: {e}")
-                continue
-            
+        def build_refactor(target_file: str, existing_content: str) -> List[CodeEdit]:
             # Generate refactored content
             refactored_content = self._llm_generate_refactored_content(intent, existing_content)
             
-            edits.append(CodeEdit(
+            return [CodeEdit(
                 file_path=target_file,
                 content=refactored_content,
                 operation="replace",
                 description=f"Refactor {target_file}"
-            ))
+            )]
         
-        return edits
+        return self._map_target_files(intent.target_files, build_refactor)
     
     def _llm_generate_content(self, intent: UserIntent, language: Language, filename: str) -> str:
         """Use LLM to generate code content."""
+        system_prompt = self._CONTENT_SYSTEM_PROMPT.format(language=language.value)
         
-        system_prompt = f"""You are an expert {language.value} programmer. Generate production-quality, working code based on the user's request.
-
-CRITICAL RULES:
-- Return ONLY the actual code, nothing else
-- NO markdown formatting (no ```), NO explanations, NO comments about the code
-- Include proper imports, error handling, and documentation within the code
-- Write complete, runnable code that solves the exact problem
-- Follow {language.value} best practices and conventions
-- Make it production-ready, not just a simple example
-
-Return the raw code file content ONLY."""
-
         user_prompt = f"""Generate complete, working {language.value} code for:
 
 {intent.context}
@@ -254,7 +307,7 @@ Requirements:
 Return ONLY the code, no markdown, no explanations."""
 
         try:
-            response = self.llm_client.generate_response(user_prompt, system_prompt)
+            response = self.llm_cache.generate_response(self.llm_client, user_prompt, system_prompt)
             # Clean the response - remove markdown code blocks if present
             clean_code = self._extract_code_from_response(response)
             return clean_code.strip()
@@ -264,8 +317,6 @@ Return ONLY the code, no markdown, no explanations."""
     
     def _extract_code_from_response(self, response: str) -> str:
         """Extract clean code from LLM response, removing markdown formatting."""
-        import re
-        
         # Remove markdown code blocks
         code_block_pattern = r'```(?:\w+)?\n?(.*?)```'
         matches = re.findall(code_block_pattern, response, re.DOTALL)
@@ -279,43 +330,39 @@ Return ONLY the code, no markdown, no explanations."""
     
     def _llm_generate_modifications(self, intent: UserIntent, existing_content: str, filename: str) -> List[CodeEdit]:
         """Use LLM to generate code modifications."""
+        system_prompt = self._MODIFICATIONS_SYSTEM_PROMPT
         
-        system_prompt = """You are an expert programmer. Analyze the existing code and generate specific modifications based on the user's request.
-
-Return a JSON array of modifications with this structure:
-[
-    {
-        "line_start": <int>,
-        "line_end": <int>,
-        "content": "<new_content>",
-        "operation": "insert|replace|delete",
-        "description": "<description>"
-    }
-]
-
-If no modifications are needed, return an empty array."""
+        # Only send the part of the file the request is about, when we can tell
+        region, line_offset = self._extract_relevant_region(existing_content, intent, filename)
+        if line_offset:
+            region_note = " (excerpt; line numbers in your response are relative to this excerpt, starting at 1)"
+        else:
+            region_note = ""
+        
+        # Static instructions first, then the file, then the request, so repeated
+        # requests against the same file share the longest possible prefix
+        user_prompt = f"""Generate the necessary modifications.
 
-        user_prompt = f"""
 File: {filename}
-Request: {intent.context}
 
-Existing code:
+Existing code{region_note}:
 ```
-{existing_content}
+{region}
 ```
 
-Generate the necessary modifications."""
+Request: {intent.context}"""
 
         try:
-            response = self.llm_client.generate_response(user_prompt, system_prompt)
+            # Structured edits should be deterministic, which also makes them cacheable
+            response = self.llm_cache.generate_response(self.llm_client, user_prompt, system_prompt, temperature=0)
             modifications = self._parse_modifications_response(response)
             
             edits = []
             for mod in modifications:
                 edits.append(CodeEdit(
                     file_path=filename,
-                    line_start=mod.get("line_start"),
-                    line_end=mod.get("line_end"),
+                    line_start=self._shift_line(mod.get("line_start"), line_offset),
+                    line_end=self._shift_line(mod.get("line_end"), line_offset),
                     content=mod.get("content", ""),
                     operation=mod.get("operation", "replace"),
                     description=mod.get("description", "")
@@ -327,20 +374,50 @@ Generate the necessary modifications."""
             logger.error(f"LLM modification generation failed: {e}")
             return []
     
+    def _extract_relevant_region(self, content: str, intent: UserIntent, filename: str) -> Tuple[str, int]:
+        """
+        Narrow a Python file down to the function/class named in the intent's
+        parameters, plus a few lines of context. Returns (code, line offset of
+        the code within the file); the whole file and offset 0 when no symbol is
+        named or it can't be found.
+        """
+        symbol = next((intent.parameters[key] for key in _SYMBOL_PARAMETERS
+                       if isinstance(intent.parameters.get(key), str)), None)
+        if not symbol or self._detect_language_from_filename(filename) != Language.PYTHON:
+            return content, 0
+        
+        try:
+            tree = ast.parse(content)
+        except (SyntaxError, ValueError):
+            return content, 0
+        
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)) and node.name == symbol:
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                end = node.end_lineno
+                break
+        else:
+            return content, 0
+        
+        lines = content.splitlines(keepends=True)
+        first = max(start - _REGION_CONTEXT_LINES, 1)
+        last = min(end + _REGION_CONTEXT_LINES, len(lines))
+        if first == 1 and last == len(lines):
+            return content, 0
+        return "".join(lines[first - 1:last]), first - 1
+    
+    @staticmethod
+    def _shift_line(line: Optional[int], offset: int) -> Optional[int]:
+        """Map a line number in an excerpt back to the full file."""
+        return line + offset if isinstance(line, int) and offset else line
+    
     def _parse_modifications_response(self, response: str) -> List[Dict[str, Any]]:
         """Parse LLM response for modifications."""
-        import json
-        
         try:
-            # Try to extract JSON from response
-            json_start = response.find('[')
-            json_end = response.rfind(']') + 1
-            
-            if json_start != -1 and json_end != -1:
-                json_str = response[json_start:json_end]
-                return json.loads(json_str)
-            else:
-                return []
+            # Extract the JSON array from response
+            return json_utils.extract(response, '[')
+        except ValueError:
+            return []
         except Exception as e:
             logger.error(f"Failed to parse modifications response: {e}")
             return []
@@ -360,27 +437,8 @@ Generate the necessary modifications."""
     
     def _detect_language_from_filename(self, filename: str) -> Language:
         """Detect language from filename extension."""
-        ext = filename.split('.')[-1].lower()
-        
-        language_map = {
-            'py': Language.PYTHON,
-            'js': Language.JAVASCRIPT,
-            'ts': Language.TYPESCRIPT,
-            'java': Language.JAVA,
-            'cpp': Language.CPP,
-            'cc': Language.CPP,
-            'cxx': Language.CPP,
-            'cs': Language.CSHARP,
-            'rs': Language.RUST,
-            'go': Language.GO,
-            'html': Language.HTML,
-            'css': Language.CSS,
-            'sql': Language.SQL,
-            'sh': Language.BASH,
-            'bash': Language.BASH
-        }
-        
-        return language_map.get(ext, Language.PYTHON)
+        ext = os.path.splitext(filename)[1][1:].lower()
+        return _LANGUAGE_MAP.get(ext, Language.PYTHON)
     
     def _fallback_content_generation(self, intent: UserIntent, language: Language) -> str:
         """Fallback content generation when LLM fails."""
@@ -424,17 +482,9 @@ if __name__ == "__main__":
         """Analyze code for potential issues."""
         issues = []
         
-        # Basic syntax checking for Python
+        # Basic syntax checking for Python (copied so callers can't alter cached results)
         if filename.endswith('.py'):
-            try:
-                ast.parse(content)
-            except SyntaxError as e:
-                issues.append({
-                    "type": "syntax_error",
-                    "message": str(e),
-                    "line": e.lineno,
-                    "severity": "error"
-                })
+            issues.extend(dict(issue) for issue in _python_syntax_issues(content))
         
         # Add more analysis as needed
         return issues
@@ -446,8 +496,7 @@ if __name__ == "__main__":
     
     def _generate_test_filename(self, target_file: str) -> str:
         """Generate test filename from target file."""
-        name = os.path.splitext(target_file)[0]
-        ext = os.path.splitext(target_file)[1]
+        name, ext = os.path.splitext(target_file)
         return f"test_{name}{ext}"
     
     def _llm_generate_test_content(self, intent: UserIntent, content: str, target_file: str) -> str:
@@ -2,72 +2,141 @@
 
 import json
 import re
-from typing import Dict, List, Optional, Any
+from typing import ClassVar, Dict, FrozenSet, List, Optional, Any
 from .models import UserIntent, IntentType, Language, CodeEdit
 from ..utils.llm_client import LLMClient
+from ..utils.llm_cache import LLMCache, get_default_cache
+from ..utils import json_utils
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Enum lookups by value for LLM output (unknown values map to None)
+_INTENT_BY_VALUE: Dict[str, IntentType] = {intent_type.value: intent_type for intent_type in IntentType}
+_LANGUAGE_BY_VALUE: Dict[str, Language] = {language.value: language for language in Language}
+
+# Intents that need the user's confirmation before they run
+_DANGEROUS_INTENTS: FrozenSet[IntentType] = frozenset({
+    IntentType.DELETE_FILE,
+    IntentType.EXECUTE_CODE,
+    IntentType.UNDO_CHANGES
+})
+
+
+def _build_intent_patterns() -> Dict[IntentType, List[re.Pattern]]:
+    """Build compiled, case-insensitive regex patterns for intent detection."""
+    patterns = {
+        IntentType.CREATE_FILE: [
+            r"create\s+(?:a\s+)?(?:new\s+)?file",
+            r"make\s+(?:a\s+)?(?:new\s+)?file",
+            r"generate\s+(?:a\s+)?file",
+            r"write\s+(?:a\s+)?(?:new\s+)?file"
+        ],
+        IntentType.EDIT_FILE: [
+            r"edit\s+(\w+\.\w+)",
+            r"modify\s+(\w+\.\w+)",
+            r"change\s+(\w+\.\w+)",
+            r"update\s+(\w+\.\w+)",
+            r"add\s+(?:to\s+)?(\w+\.\w+)",
+            r"remove\s+(?:from\s+)?(\w+\.\w+)"
+        ],
+        IntentType.EXECUTE_CODE: [
+            r"run\s+(?:the\s+)?code",
+            r"execute\s+(?:the\s+)?code",
+            r"test\s+(?:the\s+)?code",
+            r"run\s+(\w+\.\w+)",
+            r"execute\s+(\w+\.\w+)"
+        ],
+        IntentType.ANALYZE_CODE: [
+            r"analyze\s+(?:the\s+)?code",
+            r"check\s+(?:the\s+)?code",
+            r"review\s+(?:the\s+)?code",
+            r"inspect\s+(?:the\s+)?code"
+        ],
+        IntentType.DEBUG_CODE: [
+            r"debug\s+(?:the\s+)?code",
+            r"fix\s+(?:the\s+)?(?:bug|error|issue)",
+            r"troubleshoot\s+(?:the\s+)?code"
+        ],
+        IntentType.UNDO_CHANGES: [
+            r"undo\s+(?:the\s+)?(?:last\s+)?(?:change|edit)",
+            r"revert\s+(?:the\s+)?(?:last\s+)?(?:change|edit)",
+            r"rollback\s+(?:the\s+)?(?:last\s+)?(?:change|edit)"
+        ],
+        IntentType.SHOW_STATUS: [
+            r"show\s+(?:the\s+)?status",
+            r"what\s+(?:is\s+)?(?:the\s+)?current\s+status",
+            r"list\s+(?:the\s+)?files"
+        ],
+        IntentType.HELP: [
+            r"help",
+            r"what\s+can\s+you\s+do",
+            r"show\s+(?:me\s+)?(?:the\s+)?commands"
+        ]
+    }
+    return {
+        intent_type: [re.compile(pattern, re.IGNORECASE) for pattern in intent_patterns]
+        for intent_type, intent_patterns in patterns.items()
+    }
+
+
+def _build_combined_pattern(intent_patterns: Dict[IntentType, List[re.Pattern]]) -> re.Pattern:
+    """
+    Combine all intent patterns into one alternation with a named group per
+    intent, inside a zero-width lookahead. finditer then makes a single
+    left-to-right scan, and at each position reports the first-declared intent
+    that matches there.
+    """
+    alternation = "|".join(
+        f"(?P<{intent_type.value}>{'|'.join(p.pattern for p in patterns)})"
+        for intent_type, patterns in intent_patterns.items()
+    )
+    return re.compile(f"(?=(?:{alternation}))", re.IGNORECASE)
+
 
 class IntentParser:
     """Parses natural language input into structured intents."""
     
-    def __init__(self, llm_client: LLMClient):
+    # Kept byte-identical across calls so the provider can cache it
+    _INTENT_SYSTEM_PROMPT = """You are an AI coding assistant that parses natural language instructions into structured intents.
+
+Your task is to analyze user input and extract:
+1. Intent type (create_file, edit_file, execute_code, analyze_code, debug_code, etc.)
+2. Target files or code elements
+3. Specific operations to perform
+4. Programming language
+5. Code content (if applicable)
+6. Confidence score (0.0-1.0)
+
+Available intent types:
+- create_file: Create new files
+- edit_file: Modify existing files
+- delete_file: Remove files
+- execute_code: Run code
+- analyze_code: Review/check code
+- debug_code: Fix bugs or errors
+- test_code: Write/run tests
+- explain_code: Explain code functionality
+- refactor_code: Improve code structure
+- search_code: Find code patterns
+- undo_changes: Revert previous changes
+- redo_changes: Reapply previous changes
+- show_status: Display current state
+- help: Show available commands
+
+Respond with a JSON object containing the parsed intent."""
+    
+    # Compiled once and shared by all parsers
+    INTENT_PATTERNS: ClassVar[Dict[IntentType, List[re.Pattern]]] = _build_intent_patterns()
+    _COMBINED_PATTERN: ClassVar[re.Pattern] = _build_combined_pattern(INTENT_PATTERNS)
+    # Declaration order of the intents: earlier ones take precedence
+    _INTENT_RANK: ClassVar[Dict[str, int]] = {
+        intent_type.value: rank for rank, intent_type in enumerate(INTENT_PATTERNS)
+    }
+    
+    def __init__(self, llm_client: LLMClient, llm_cache: Optional[LLMCache] = None):
         self.llm_client = llm_client
-        self.intent_patterns = self._build_intent_patterns()
-        
-    def _build_intent_patterns(self) -> Dict[IntentType, List[str]]:
-        """Build regex patterns for intent detection."""
-        return {
-            IntentType.CREATE_FILE: [
-                r"create\s+(?:a\s+)?(?:new\s+)?file",
-                r"make\s+(?:a\s+)?(?:new\s+)?file",
-                r"generate\s+(?:a\s+)?file",
-                r"write\s+(?:a\s+)?(?:new\s+)?file"
-            ],
-            IntentType.EDIT_FILE: [
-                r"edit\s+(\w+\.\w+)",
-                r"modify\s+(\w+\.\w+)",
-                r"change\s+(\w+\.\w+)",
-                r"update\s+(\w+\.\w+)",
-                r"add\s+(?:to\s+)?(\w+\.\w+)",
-                r"remove\s+(?:from\s+)?(\w+\.\w+)"
-            ],
-            IntentType.EXECUTE_CODE: [
-                r"run\s+(?:the\s+)?code",
-                r"execute\s+(?:the\s+)?code",
-                r"test\s+(?:the\s+)?code",
-                r"run\s+(\w+\.\w+)",
-                r"execute\s+(\w+\.\w+)"
-            ],
-            IntentType.ANALYZE_CODE: [
-                r"analyze\s+(?:the\s+)?code",
-                r"check\s+(?:the\s+)?code",
-                r"review\s+(?:the\s+)?code",
-                r"inspect\s+(?:the\s+)?code"
-            ],
-            IntentType.DEBUG_CODE: [
-                r"debug\s+(?:the\s+)?code",
-                r"fix\s+(?:the\s+)?(?:bug|error|issue)",
-                r"troubleshoot\s+(?:the\s+)?code"
-            ],
-            IntentType.UNDO_CHANGES: [
-                r"undo\s+(?:the\s+)?(?:last\s+)?(?:change|edit)",
-                r"revert\s+(?:the\s+)?(?:last\s+)?(?:change|edit)",
-                r"rollback\s+(?:the\s+)?(?:last\s+)?(?:change|edit)"
-            ],
-            IntentType.SHOW_STATUS: [
-                r"show\s+(?:the\s+)?status",
-                r"what\s+(?:is\s+)?(?:the\s+)?current\s+status",
-                r"list\s+(?:the\s+)?files"
-            ],
-            IntentType.HELP: [
-                r"help",
-                r"what\s+can\s+you\s+do",
-                r"show\s+(?:me\s+)?(?:the\s+)?commands"
-            ]
-        }
+        self.llm_cache = llm_cache or get_default_cache()
     
     def parse_intent(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> UserIntent:
         """
@@ -95,55 +164,33 @@ class IntentParser:
         return final_intent
     
     def _pattern_match_intent(self, user_input: str) -> Optional[IntentType]:
-        """Quick pattern-based intent classification."""
-        user_input_lower = user_input.lower()
-        
-        for intent_type, patterns in self.intent_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, user_input_lower):
-                    return intent_type
-        return None
+        """
+        Quick pattern-based intent classification: the first-declared intent
+        with a match anywhere in the input, found in one scan of the input.
+        """
+        best: Optional[str] = None
+        for match in self._COMBINED_PATTERN.finditer(user_input):
+            if best is None or self._INTENT_RANK[match.lastgroup] < self._INTENT_RANK[best]:
+                best = match.lastgroup
+                if self._INTENT_RANK[best] == 0:
+                    break
+        return _INTENT_BY_VALUE[best] if best else None
     
     def _llm_parse_intent(self, user_input: str, context: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Use LLM for detailed intent parsing."""
+        system_prompt = self._INTENT_SYSTEM_PROMPT
         
-        system_prompt = """You are an AI coding assistant that parses natural language instructions into structured intents.
-
-Your task is to analyze user input and extract:
-1. Intent type (create_file, edit_file, execute_code, analyze_code, debug_code, etc.)
-2. Target files or code elements
-3. Specific operations to perform
-4. Programming language
-5. Code content (if applicable)
-6. Confidence score (0.0-1.0)
-
-Available intent types:
-- create_file: Create new files
-- edit_file: Modify existing files
-- delete_file: Remove files
-- execute_code: Run code
-- analyze_code: Review/check code
-- debug_code: Fix bugs or errors
-- test_code: Write/run tests
-- explain_code: Explain code functionality
-- refactor_code: Improve code structure
-- search_code: Find code patterns
-- undo_changes: Revert previous changes
-- redo_changes: Reapply previous changes
-- show_status: Display current state
-- help: Show available commands
-
-Respond with a JSON object containing the parsed intent."""
-
         context_str = ""
         if context:
-            context_str = f"\nContext: {json.dumps(context, indent=2)}"
+            context_str = f"\nContext: {json.dumps(context, separators=(',', ':'))}"
         
-        prompt = f"{system_prompt}\n\nUser input: {user_input}{context_str}"
+        # The instructions go only in the system prompt, not repeated here
+        prompt = f"User input: {user_input}{context_str}"
         
         try:
-            response = self.llm_client.generate_response(prompt, system_prompt)
-            return json.loads(response)
+            # Classification should be deterministic, which also makes it cacheable
+            response = self.llm_cache.generate_response(self.llm_client, prompt, system_prompt, temperature=0)
+            return json_utils.loads(response)
         except Exception as e:
             logger.error(f"LLM intent parsing failed: {e}")
             return {"intent_type": "help", "confidence": 0.5}
@@ -152,16 +199,18 @@ Respond with a JSON object containing the parsed intent."""
                             llm_result: Dict[str, Any], user_input: str) -> UserIntent:
         """Merge pattern matching and LLM results."""
         
+        llm_intent = self._lookup_enum(_INTENT_BY_VALUE, llm_result.get("intent_type"), "intent type")
+        
         # Determine final intent type
-        if pattern_intent and llm_result.get("intent_type"):
+        if pattern_intent and llm_intent:
             # If both agree, use LLM result (more detailed)
-            final_intent_type = IntentType(llm_result["intent_type"])
+            final_intent_type = llm_intent
             confidence = llm_result.get("confidence", 0.8)
         elif pattern_intent:
             final_intent_type = pattern_intent
             confidence = 0.7
-        elif llm_result.get("intent_type"):
-            final_intent_type = IntentType(llm_result["intent_type"])
+        elif llm_intent:
+            final_intent_type = llm_intent
             confidence = llm_result.get("confidence", 0.6)
         else:
             final_intent_type = IntentType.HELP
@@ -171,12 +220,7 @@ Respond with a JSON object containing the parsed intent."""
         parameters = llm_result.get("parameters", {})
         
         # Determine language
-        language = None
-        if llm_result.get("language"):
-            try:
-                language = Language(llm_result["language"])
-            except ValueError:
-                pass
+        language = self._lookup_enum(_LANGUAGE_BY_VALUE, llm_result.get("language"), "language")
         
         # Extract target files and ensure it's a list
         target_files = llm_result.get("target_files", [])
@@ -204,6 +248,16 @@ Respond with a JSON object containing the parsed intent."""
             requires_confirmation=self._requires_confirmation(final_intent_type, parameters)
         )
     
+    @staticmethod
+    def _lookup_enum(by_value: Dict[str, Any], raw: Any, label: str) -> Optional[Any]:
+        """Convert an LLM-supplied value to its enum member, or None (logged) if unknown."""
+        if not raw:
+            return None
+        member = by_value.get(raw) if isinstance(raw, str) else None
+        if member is None:
+            logger.warning(f"Ignoring unknown {label} from LLM: {raw!r}")
+        return member
+    
     def _generate_code_edits(self, llm_result: Dict[str, Any], user_input: str) -> List[CodeEdit]:
         """Generate CodeEdit objects from LLM results."""
         edits = []
@@ -233,10 +287,4 @@ Respond with a JSON object containing the parsed intent."""
     
     def _requires_confirmation(self, intent_type: IntentType, parameters: Dict[str, Any]) -> bool:
         """Determine if intent requires user confirmation."""
-        dangerous_operations = [
-            IntentType.DELETE_FILE,
-            IntentType.EXECUTE_CODE,
-            IntentType.UNDO_CHANGES
-        ]
-        
-        return intent_type in dangerous_operations or parameters.get("destructive", False)
+        return intent_type in _DANGEROUS_INTENTS or parameters.get("destructive", False)
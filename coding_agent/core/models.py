@@ -1,10 +1,15 @@
 """Data models for the coding agent system."""
 
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional, Any, Union
-from pydantic import BaseModel, Field
+from typing import Dict, List, Mapping, Optional, Any, Tuple, Union
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
+# Shared by the pydantic models: unknown keys (e.g. extra LLM output) are
+# dropped and assignments aren't re-validated
+_MODEL_CONFIG = ConfigDict(extra='ignore', validate_assignment=False)
+
 
 class IntentType(str, Enum):
     """Types of user intents."""
@@ -41,18 +46,25 @@ class Language(str, Enum):
     SHELL = "shell"
 
 
-class CodeEdit(BaseModel):
-    """Represents a code edit operation."""
+@dataclass(frozen=True)
+class CodeEdit:
+    """
+    Represents a code edit operation.
+    A plain dataclass rather than a pydantic model: edits are created in bulk
+    by our own code, so they don't need validation.
+    """
     file_path: str
+    content: str
+    operation: str = field(metadata={"description": "insert, replace, delete"})
     line_start: Optional[int] = None
     line_end: Optional[int] = None
-    content: str
-    operation: str = Field(..., description="insert, replace, delete")
     description: Optional[str] = None
 
 
 class ExecutionResult(BaseModel):
     """Result of code execution."""
+    model_config = _MODEL_CONFIG
+    
     success: bool
     stdout: str = ""
     stderr: str = ""
@@ -64,6 +76,8 @@ class ExecutionResult(BaseModel):
 
 class UserIntent(BaseModel):
     """Parsed user intent with structured information."""
+    model_config = _MODEL_CONFIG
+    
     intent_type: IntentType
     confidence: float = Field(..., ge=0.0, le=1.0)
     parameters: Dict[str, Any] = Field(default_factory=dict)
@@ -77,6 +91,8 @@ class UserIntent(BaseModel):
 
 class SessionState(BaseModel):
     """Current session state."""
+    model_config = _MODEL_CONFIG
+    
     session_id: str
     project_root: str
     current_files: List[str] = Field(default_factory=list)
@@ -89,6 +105,8 @@ class SessionState(BaseModel):
 
 class AgentResponse(BaseModel):
     """Agent's response to user input."""
+    model_config = _MODEL_CONFIG
+    
     intent: UserIntent
     generated_code: Optional[str] = None
     execution_result: Optional[ExecutionResult] = None
@@ -98,10 +116,16 @@ class AgentResponse(BaseModel):
     requires_confirmation: bool = False
 
 
-class SafetyCheck(BaseModel):
-    """Safety validation for code execution."""
+@dataclass(frozen=True)
+class SafetyCheck:
+    """
+    Safety validation for code execution.
+    A plain dataclass: it is built by the sandbox on every execution and never
+    crosses an API boundary, so it doesn't need validation. The sequence
+    fields are tuples because the sandbox shares instances between calls.
+    """
     is_safe: bool
-    warnings: List[str] = Field(default_factory=list)
-    blocked_operations: List[str] = Field(default_factory=list)
-    resource_limits: Dict[str, Any] = Field(default_factory=dict)
-    security_concerns: List[str] = Field(default_factory=list)
+    warnings: Tuple[str, ...] = ()
+    blocked_operations: Tuple[str, ...] = ()
+    resource_limits: Mapping[str, Any] = field(default_factory=dict)
+    security_concerns: Tuple[str, ...] = ()
@@ -1,54 +1,332 @@
 """Sandboxed execution environment using E2B."""
 
+import asyncio
+import base64
+import hashlib
+import inspect
+import io
 import os
+import re
+import secrets
+import tarfile
+import threading
 import time
 import json
-from typing import Dict, List, Optional, Any, Tuple
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Callable, Deque, Dict, FrozenSet, List, Mapping, Optional, Any, Set, Tuple
 from ..core.models import ExecutionResult, SafetyCheck
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# How many safety check results are remembered per executor
+_SAFETY_CACHE_SIZE = 512
+
+# Where batched uploads are staged inside the sandbox
+_UPLOAD_ARCHIVE = "/tmp/_upload.tar"
+
+# Sandboxes are recycled through the pool until they are this old (seconds)
+_SANDBOX_MAX_AGE = 600.0
+
+# How long a sandbox's probed system info is reused (seconds)
+_SANDBOX_PROBE_TTL = 30.0
+
+# Largest program (in UTF-8 bytes) shipped inside the command itself. Base64
+# grows it by a third, which keeps the argument well under Linux's 128 KiB
+# per-argument limit (MAX_ARG_STRLEN); larger programs are uploaded instead
+_INLINE_CODE_LIMIT = 64 * 1024
+
+# Clears what earlier executions left behind before a sandbox is reused
+_SANDBOX_RESET_COMMAND = f"rm -rf /tmp/execution* {_UPLOAD_ARCHIVE}"
+
+# Dangerous imports/operations, matched against the lowercased code (ASCII only)
+_DANGEROUS_PATTERNS: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    "python": (
+        "import os", "import subprocess", "import sys", "__import__",
+        "exec(", "eval(", "compile(", "open(", "file(",
+        "socket", "urllib", "requests", "http.client"
+    ),
+    "javascript": (
+        "require(", "import(", "eval(", "Function(",
+        "process", "fs", "child_process", "http", "https"
+    ),
+    "bash": (
+        "rm -rf", "dd if=", "mkfs", "format", "fdisk",
+        "chmod 777", "chown", "su ", "sudo ", "passwd"
+    )
+})
+
+# Resource limits reported with every safety check
+_RESOURCE_LIMITS: Mapping[str, Any] = MappingProxyType({
+    "max_execution_time": 30,
+    "max_memory": "512MB",
+    "max_files": 10
+})
+
+# Safety check result for trusted code, which isn't scanned (shared, so every
+# field is immutable)
+_TRUSTED_SAFETY_CHECK = SafetyCheck(is_safe=True, resource_limits=_RESOURCE_LIMITS)
+
+# Temporary file extensions for languages run through _execute_generic
+_EXT_MAP: Mapping[str, str] = MappingProxyType({
+    "java": ".java",
+    "cpp": ".cpp",
+    "c": ".c",
+    "rust": ".rs",
+    "go": ".go"
+})
+
+# Patterns that only produce a warning rather than blocking execution
+_WARNING_PATTERNS = frozenset({"import os", "import subprocess", "import sys"})
+
+
+def _compile_pattern_scan(patterns: Tuple[str, ...]) -> Tuple[re.Pattern, Dict[bytes, FrozenSet[str]]]:
+    """
+    Build a bytes regex that finds all of patterns in one pass, plus a map from
+    each (encoded) pattern to the patterns it contains. The lookahead tries every
+    position, longest pattern first, so a shorter pattern at the same position
+    (e.g. "http" under "https") is only found through the map.
+    """
+    alternation = b"|".join(re.escape(p.encode('utf-8')) for p in sorted(patterns, key=len, reverse=True))
+    implied = {p.encode('utf-8'): frozenset(q for q in patterns if q in p) for p in patterns}
+    return re.compile(b"(?=(" + alternation + b"))"), implied
+
+
+def _find_patterns(scan: Tuple[re.Pattern, Dict[bytes, FrozenSet[str]]], code: bytes) -> Set[str]:
+    """Run a pattern scan over code, returning every pattern that occurs in it."""
+    regex, implied = scan
+    found: Set[str] = set()
+    for match in regex.finditer(code):
+        found |= implied[match.group(1)]
+    return found
+
+
+# Blocking and warning-only patterns are scanned separately, so a check can
+# stop as soon as it knows the code is blocked
+_BLOCK_PATTERNS = {
+    language: tuple(p for p in patterns if p not in _WARNING_PATTERNS)
+    for language, patterns in _DANGEROUS_PATTERNS.items()
+}
+_WARN_PATTERNS = {
+    language: tuple(p for p in patterns if p in _WARNING_PATTERNS)
+    for language, patterns in _DANGEROUS_PATTERNS.items()
+}
+_BLOCK_SCANS = {
+    language: _compile_pattern_scan(patterns)
+    for language, patterns in _BLOCK_PATTERNS.items() if patterns
+}
+_WARN_SCANS = {
+    language: _compile_pattern_scan(patterns)
+    for language, patterns in _WARN_PATTERNS.items() if patterns
+}
+
+
+_http_client = None
+
+
+def _shared_http_client() -> Any:
+    """Process-wide httpx client for E2B API calls, so TLS handshakes are paid once."""
+    global _http_client
+    if _http_client is None:
+        import httpx
+        _http_client = httpx.Client(limits=httpx.Limits(max_keepalive_connections=32))
+    return _http_client
+
+
+def _accepts_keyword(func: Callable, name: str) -> bool:
+    """Whether func takes a keyword argument called name (SDK versions differ)."""
+    try:
+        return name in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def _decode_command(data: bytes) -> str:
+    """Shell pipeline that prints data, so it can be shipped inside a single command."""
+    return f"echo {base64.b64encode(data).decode('ascii')} | base64 -d"
+
+
+def _pack_files(files: Dict[str, str]) -> bytes:
+    """Pack {path: content} into an uncompressed in-memory tar archive."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for file_path, content in files.items():
+            data = content.encode('utf-8')
+            info = tarfile.TarInfo(name=file_path)
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = int(time.time())
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+class SandboxPool:
+    """
+    Keeps pre-created E2B sandboxes ready so that acquiring one skips the
+    create() cold start. A background task tops the pool up to min_idle
+    sandboxes; sandboxes older than max_age are killed instead of reused.
+    """
+    
+    def __init__(self, create: Callable[[], Any], min_idle: int = 0, max_age: float = _SANDBOX_MAX_AGE):
+        self._create = create
+        self.min_idle = min_idle
+        self.max_age = max_age
+        # (creation time, sandbox), oldest first
+        self._idle: Deque[Tuple[float, Any]] = deque()
+        # Creation times of sandboxes that are checked out, by id
+        self._checked_out: Dict[int, float] = {}
+        self._refill_task: Optional[asyncio.Task] = None
+        self._closed = False
+    
+    async def acquire(self) -> Any:
+        """Take a warm sandbox, creating one if none is ready."""
+        self._closed = False
+        now = time.monotonic()
+        entry = None
+        while self._idle:
+            created_at, sandbox = self._idle.popleft()
+            if now - created_at < self.max_age:
+                entry = (created_at, sandbox)
+                break
+            self._kill(sandbox)
+        
+        if entry is None:
+            entry = await self._spawn()
+        
+        created_at, sandbox = entry
+        self._checked_out[id(sandbox)] = created_at
+        self._schedule_refill()
+        return sandbox
+    
+    async def release(self, sandbox: Any) -> None:
+        """Reset a sandbox and return it to the pool, or kill it if it's too old or not needed."""
+        created_at = self._checked_out.pop(id(sandbox), None)
+        if (created_at is None or self._closed or len(self._idle) >= self.min_idle
+                or time.monotonic() - created_at >= self.max_age):
+            self._kill(sandbox)
+            return
+        
+        try:
+            process = await sandbox.process.start(_SANDBOX_RESET_COMMAND)
+            await process.wait()
+        except Exception as e:
+            logger.warning("Failed to reset sandbox, discarding it: %s", e)
+            self._kill(sandbox)
+            return
+        
+        self._idle.append((created_at, sandbox))
+    
+    def discard(self, sandbox: Any) -> None:
+        """Kill a checked-out sandbox instead of returning it to the pool."""
+        self._checked_out.pop(id(sandbox), None)
+        self._kill(sandbox)
+    
+    async def close(self) -> None:
+        """Stop pre-warming and kill all idle sandboxes."""
+        self._closed = True
+        if self._refill_task is not None:
+            # Let an in-flight create finish so its sandbox isn't leaked
+            await asyncio.gather(self._refill_task, return_exceptions=True)
+            self._refill_task = None
+        
+        while self._idle:
+            self._kill(self._idle.popleft()[1])
+    
+    def _schedule_refill(self) -> None:
+        """Start the background refill unless it is already running."""
+        if self.min_idle > 0 and (self._refill_task is None or self._refill_task.done()):
+            self._refill_task = asyncio.ensure_future(self._refill())
+    
+    async def _refill(self) -> None:
+        """Create sandboxes until min_idle are waiting."""
+        while not self._closed and len(self._idle) < self.min_idle:
+            try:
+                self._idle.append(await self._spawn())
+            except Exception as e:
+                logger.warning("Failed to pre-warm sandbox: %s", e)
+                return
+    
+    async def _spawn(self) -> Tuple[float, Any]:
+        """Create a sandbox (a blocking SDK call) in a worker thread."""
+        loop = asyncio.get_event_loop()
+        sandbox = await loop.run_in_executor(None, self._create)
+        return time.monotonic(), sandbox
+    
+    @staticmethod
+    def _kill(sandbox: Any) -> None:
+        """Kill a sandbox, logging failures."""
+        try:
+            sandbox.kill()
+        except Exception as e:
+            logger.warning("Failed to kill sandbox: %s", e)
+
 
 class SandboxExecutor:
     """Executes code in a sandboxed environment using E2B."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, pool_size: Optional[int] = None):
         self.api_key = api_key or os.getenv("E2B_API_KEY")
         self.client = None
         self.current_sandbox = None
+        # Safety check results by (language, code digest), most recently used last
+        self._safety_cache: "OrderedDict[Tuple[str, bytes], SafetyCheck]" = OrderedDict()
+        self._safety_lock = threading.Lock()
         self._init_e2b_client()
+        
+        if pool_size is None:
+            # Spare sandboxes are billed while idle, so pre-warming is opt-in
+            pool_size = int(os.getenv("E2B_SANDBOX_POOL_SIZE", "0"))
+        create_kwargs = {"api_key": self.api_key}
+        if _accepts_keyword(self.Sandbox.create, "http_client"):
+            # Share one keep-alive HTTP connection pool across executors
+            create_kwargs["http_client"] = _shared_http_client()
+        self._pool = SandboxPool(lambda: self.Sandbox.create(**create_kwargs), min_idle=pool_size)
+        
+        # Serializes the "create a sandbox if there is none" step; created on
+        # first use so it belongs to the running event loop
+        self._create_lock: Optional[asyncio.Lock] = None
+        # (sandbox, probe time, system info) from the last get_sandbox_info probe
+        self._probe_cache: Optional[Tuple[Any, float, str]] = None
     
     def _init_e2b_client(self) -> None:
         """Initialize E2B client."""
         try:
-            from e2b_code_interpreter import Sandbox
+            try:
+                from e2b_code_interpreter import Sandbox
+            except ImportError:
+                # The plain SDK can run everything, just without run_code for Python
+                from e2b import Sandbox
             self.Sandbox = Sandbox
+            self._has_run_code = hasattr(Sandbox, "run_code")
             logger.info("E2B client initialized successfully")
         except ImportError:
             logger.error("E2B library not installed. Install with: pip install e2b-code-interpreter")
             raise ImportError("E2B library not installed")
         except Exception as e:
-            logger.error(f"Failed to initialize E2B client: {e}")
+            logger.error("Failed to initialize E2B client: %s", e)
             raise
     
     async def create_sandbox(self, template: str = "base") -> bool:
         """Create a new sandbox environment."""
         try:
             if self.current_sandbox:
-                await self.terminate_sandbox()
+                # Recycle the old sandbox rather than killing it
+                sandbox, self.current_sandbox = self.current_sandbox, None
+                await self._pool.release(sandbox)
             
-            # Updated E2B API - use create() method
-            self.current_sandbox = self.Sandbox.create(api_key=self.api_key)
-            logger.info(f"Created E2B code interpreter sandbox")
+            # Pre-warmed when the pool has one ready, otherwise created now
+            self.current_sandbox = await self._pool.acquire()
+            logger.info("Created E2B code interpreter sandbox")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to create sandbox: {e}")
+            logger.error("Failed to create sandbox: %s", e)
             return False
     
     async def execute_code(self, code: str, language: str = "python", 
-                          timeout: int = 30, files: Optional[Dict[str, str]] = None) -> ExecutionResult:
+                          timeout: int = 30, files: Optional[Dict[str, str]] = None,
+                          trusted: bool = False) -> ExecutionResult:
         """
         Execute code in the sandbox.
         
@@ -57,6 +335,8 @@ class SandboxExecutor:
             language: Programming language
             timeout: Execution timeout in seconds
             files: Additional files to upload
+            trusted: Skip the safety check (only for code the agent generated
+                from its own templates, never for user or LLM-written code)
             
         Returns:
             ExecutionResult with execution details
@@ -64,32 +344,37 @@ class SandboxExecutor:
         start_time = time.time()
         
         try:
-            # Ensure sandbox exists
-            if not self.current_sandbox:
-                await self.create_sandbox()
+            # Perform safety check in a worker thread while the sandbox is
+            # prepared, since it needs no network
+            if not trusted:
+                loop = asyncio.get_event_loop()
+                safety_future = loop.run_in_executor(None, self._check_code_safety, code, language)
+            
+            # Ensure sandbox exists (only one concurrent caller creates it)
+            if self._create_lock is None:
+                self._create_lock = asyncio.Lock()
+            async with self._create_lock:
+                if not self.current_sandbox:
+                    await self.create_sandbox()
             
             # Upload files if provided
             if files:
                 await self._upload_files(files)
             
-            # Perform safety check
-            safety_check = self._check_code_safety(code, language)
+            safety_check = _TRUSTED_SAFETY_CHECK if trusted else await safety_future
             if not safety_check.is_safe:
-                logger.warning(f"Code failed safety check: {safety_check.warnings}")
+                logger.warning("Code failed safety check: %s", safety_check.security_concerns)
                 return ExecutionResult(
                     success=False,
-                    stderr=f"Code failed safety check: {', '.join(safety_check.warnings)}",
+                    stderr=f"Code failed safety check: {', '.join(safety_check.security_concerns)}",
                     exit_code=1,
                     execution_time=time.time() - start_time
                 )
             
             # Execute code based on language
-            if language.lower() == "python":
-                result = await self._execute_python(code, timeout)
-            elif language.lower() in ["javascript", "js"]:
-                result = await self._execute_javascript(code, timeout)
-            elif language.lower() in ["bash", "shell"]:
-                result = await self._execute_shell(code, timeout)
+            handler = self._DISPATCH.get(language.lower())
+            if handler is not None:
+                result = await handler(self, code, timeout)
             else:
                 result = await self._execute_generic(code, language, timeout)
             
@@ -97,7 +382,7 @@ class SandboxExecutor:
             return result
             
         except Exception as e:
-            logger.error(f"Code execution failed: {e}")
+            logger.error("Code execution failed: %s", e)
             return ExecutionResult(
                 success=False,
                 stderr=str(e),
@@ -106,49 +391,69 @@ class SandboxExecutor:
             )
     
     async def _upload_files(self, files: Dict[str, str]) -> None:
-        """Upload files to sandbox."""
+        """
+        Upload files to sandbox.
+        Several files are packed into one tar archive, uploaded with a single
+        write and unpacked with a single command, instead of a round trip per
+        file (tar also creates any missing directories).
+        """
         try:
-            for file_path, content in files.items():
+            if len(files) == 1:
                 # Use E2B code interpreter's filesystem API
-                self.current_sandbox.filesystem.write(file_path, content)
+                for file_path, content in files.items():
+                    self.current_sandbox.filesystem.write(file_path, content)
+            else:
+                self.current_sandbox.filesystem.write(_UPLOAD_ARCHIVE, _pack_files(files))
                 
-            logger.info(f"Uploaded {len(files)} files to sandbox")
+                # -P keeps absolute paths absolute; relative ones land in the working directory
+                process = await self.current_sandbox.process.start(
+                    f"tar -xPf {_UPLOAD_ARCHIVE} && rm -f {_UPLOAD_ARCHIVE}"
+                )
+                await process.wait()
+                if process.exit_code != 0:
+                    raise RuntimeError(f"Failed to unpack uploaded files: {process.stderr}")
+                
+            logger.info("Uploaded %d files to sandbox", len(files))
             
         except Exception as e:
-            logger.error(f"Failed to upload files: {e}")
+            logger.error("Failed to upload files: %s", e)
             raise
     
     async def _execute_python(self, code: str, timeout: int) -> ExecutionResult:
         """Execute Python code."""
+        if not self._has_run_code:
+            # Pipe the code into the interpreter in one command instead
+            return await self._run_command(f"{self._code_source(code)} | python3 -", timeout)
+        
         try:
             # Use E2B code interpreter's run_code method
             execution = self.current_sandbox.run_code(code)
             
-            # Collect output
-            stdout_text = ""
-            stderr_text = ""
+            # Collect output pieces and join each stream once at the end
+            stdout_parts: List[str] = []
+            stderr_parts: List[str] = []
             
             if hasattr(execution, 'logs'):
                 if hasattr(execution.logs, 'stdout'):
-                    stdout_text = "\n".join([str(log) for log in execution.logs.stdout])
+                    stdout_parts.append("\n".join(map(str, execution.logs.stdout)))
                 if hasattr(execution.logs, 'stderr'):
-                    stderr_text = "\n".join([str(log) for log in execution.logs.stderr])
+                    stderr_parts.append("\n".join(map(str, execution.logs.stderr)))
             
             if hasattr(execution, 'results'):
                 for result in execution.results:
                     if hasattr(result, 'text'):
-                        stdout_text += f"\n{result.text}"
+                        stdout_parts.append(str(result.text))
                     else:
-                        stdout_text += f"\n{result}"
+                        stdout_parts.append(str(result))
             
             success = not execution.error if hasattr(execution, 'error') else True
             if hasattr(execution, 'error') and execution.error:
-                stderr_text += f"\n{execution.error.name}: {execution.error.value}"
+                stderr_parts.append(f"{execution.error.name}: {execution.error.value}")
             
             return ExecutionResult(
                 success=success,
-                stdout=stdout_text.strip(),
-                stderr=stderr_text.strip(),
+                stdout="\n".join(stdout_parts).strip(),
+                stderr="\n".join(stderr_parts).strip(),
                 exit_code=0 if success else 1
             )
             
@@ -161,38 +466,32 @@ class SandboxExecutor:
     
     async def _execute_javascript(self, code: str, timeout: int) -> ExecutionResult:
         """Execute JavaScript code."""
-        try:
-            # Write code to temporary file
-            temp_file = "/tmp/execution.js"
-            await self.current_sandbox.filesystem.write(temp_file, code)
-            
-            # Execute the file
-            process = await self.current_sandbox.process.start(
-                f"node {temp_file}",
-                timeout=timeout
-            )
-            
-            await process.wait()
-            
-            return ExecutionResult(
-                success=process.exit_code == 0,
-                stdout=process.stdout,
-                stderr=process.stderr,
-                exit_code=process.exit_code
-            )
-            
-        except Exception as e:
-            return ExecutionResult(
-                success=False,
-                stderr=str(e),
-                exit_code=1
-            )
+        # Pipe the code into node: one round trip, no temporary file
+        return await self._run_command(f"{self._code_source(code)} | node -", timeout)
     
     async def _execute_shell(self, code: str, timeout: int) -> ExecutionResult:
         """Execute shell commands."""
+        return await self._run_command(code, timeout)
+    
+    def _code_source(self, code: str) -> str:
+        """
+        Shell command that prints code. Small programs travel inside the command
+        itself; larger ones are uploaded first (where the reset command will
+        also find them) and printed from there.
+        """
+        data = code.encode('utf-8')
+        if len(data) <= _INLINE_CODE_LIMIT:
+            return _decode_command(data)
+        
+        staged = f"/tmp/execution_upload_{secrets.token_hex(4)}"
+        self.current_sandbox.filesystem.write(staged, code)
+        return f"{{ cat {staged} && rm -f {staged}; }}"
+    
+    async def _run_command(self, command: str, timeout: int) -> ExecutionResult:
+        """Run one command in the sandbox and collect its result."""
         try:
             process = await self.current_sandbox.process.start(
-                code,
+                command,
                 timeout=timeout
             )
             
@@ -214,114 +513,88 @@ class SandboxExecutor:
     
     async def _execute_generic(self, code: str, language: str, timeout: int) -> ExecutionResult:
         """Execute code in generic way."""
-        try:
-            # Create temporary file with appropriate extension
-            ext_map = {
-                "java": ".java",
-                "cpp": ".cpp",
-                "c": ".c",
-                "rust": ".rs",
-                "go": ".go"
-            }
-            
-            ext = ext_map.get(language.lower(), ".txt")
-            temp_file = f"/tmp/execution{ext}"
-            
-            await self.current_sandbox.filesystem.write(temp_file, code)
-            
-            # Try to execute based on language
-            if language.lower() == "java":
-                # Compile first
-                compile_process = await self.current_sandbox.process.start(
-                    f"javac {temp_file}",
-                    timeout=timeout
-                )
-                await compile_process.wait()
-                
-                if compile_process.exit_code != 0:
-                    return ExecutionResult(
-                        success=False,
-                        stderr=compile_process.stderr,
-                        exit_code=compile_process.exit_code
-                    )
-                
-                # Execute compiled class
-                class_name = "execution"
-                process = await self.current_sandbox.process.start(
-                    f"java {class_name}",
-                    timeout=timeout
-                )
-            else:
-                # For other languages, try direct execution
-                process = await self.current_sandbox.process.start(
-                    f"timeout {timeout} {language} {temp_file}",
-                    timeout=timeout
-                )
-            
-            await process.wait()
-            
-            return ExecutionResult(
-                success=process.exit_code == 0,
-                stdout=process.stdout,
-                stderr=process.stderr,
-                exit_code=process.exit_code
-            )
-            
-        except Exception as e:
-            return ExecutionResult(
-                success=False,
-                stderr=str(e),
-                exit_code=1
-            )
+        # Create temporary file with appropriate extension, in a directory
+        # of its own so concurrent executions don't overwrite each other
+        ext = _EXT_MAP.get(language.lower(), ".txt")
+        work_dir = f"/tmp/execution_{secrets.token_hex(4)}"
+        temp_file = f"execution{ext}"
+        
+        # Try to execute based on language
+        if language.lower() == "java":
+            # Compile first, then execute compiled class
+            class_name = "execution"
+            run = f"javac {temp_file} && java {class_name}"
+        else:
+            # For other languages, try direct execution
+            run = f"timeout {timeout} {language} {temp_file}"
+        
+        # Writing, compiling and running happen in a single command (one
+        # round trip); the directory is removed afterwards, keeping the exit code
+        return await self._run_command(
+            f"mkdir -p {work_dir} && cd {work_dir} && {self._code_source(code)} > {temp_file} && {run}; "
+            f"status=$?; rm -rf {work_dir}; exit $status",
+            timeout
+        )
+    
+    # Languages with a dedicated runner (lowercase name -> unbound method);
+    # everything else goes through _execute_generic
+    _DISPATCH = {
+        "python": _execute_python,
+        "javascript": _execute_javascript,
+        "js": _execute_javascript,
+        "bash": _execute_shell,
+        "shell": _execute_shell
+    }
     
     def _check_code_safety(self, code: str, language: str) -> SafetyCheck:
-        """Perform safety checks on code before execution."""
+        """Perform safety checks on code before execution (cached for repeated code)."""
+        key = (language.lower(), hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest())
+        with self._safety_lock:
+            safety_check = self._safety_cache.get(key)
+            if safety_check is not None:
+                self._safety_cache.move_to_end(key)
+                return safety_check
+        
+        safety_check = self._scan_code_safety(code, language)
+        with self._safety_lock:
+            self._safety_cache[key] = safety_check
+            if len(self._safety_cache) > _SAFETY_CACHE_SIZE:
+                self._safety_cache.popitem(last=False)
+        return safety_check
+    
+    def _scan_code_safety(self, code: str, language: str) -> SafetyCheck:
+        """Scan code for dangerous patterns."""
         warnings = []
         blocked_operations = []
         security_concerns = []
         
-        # Dangerous imports/operations
-        dangerous_patterns = {
-            "python": [
-                "import os", "import subprocess", "import sys", "__import__",
-                "exec(", "eval(", "compile(", "open(", "file(",
-                "socket", "urllib", "requests", "http.client"
-            ],
-            "javascript": [
-                "require(", "import(", "eval(", "Function(",
-                "process", "fs", "child_process", "http", "https"
-            ],
-            "bash": [
-                "rm -rf", "dd if=", "mkfs", "format", "fdisk",
-                "chmod 777", "chown", "su ", "sudo ", "passwd"
-            ]
-        }
+        # The patterns are ASCII, so lowercasing the encoded bytes is enough and
+        # the scans run on bytes without decoding anything back
+        lang = language.lower()
+        code_bytes = code.encode('utf-8', 'ignore').lower()
         
-        patterns = dangerous_patterns.get(language.lower(), [])
-        
-        for pattern in patterns:
-            if pattern in code.lower():
-                if pattern in ["import os", "import subprocess", "import sys"]:
-                    warnings.append(f"Potentially dangerous import: {pattern}")
-                else:
+        if lang in _BLOCK_SCANS:
+            found = _find_patterns(_BLOCK_SCANS[lang], code_bytes)
+            for pattern in _BLOCK_PATTERNS[lang]:
+                if pattern in found:
                     blocked_operations.append(pattern)
                     security_concerns.append(f"Blocked dangerous operation: {pattern}")
         
-        # Resource limits
-        resource_limits = {
-            "max_execution_time": 30,
-            "max_memory": "512MB",
-            "max_files": 10
-        }
+        # Warnings are informational, so don't bother once the code is blocked
+        if not blocked_operations and lang in _WARN_SCANS:
+            found = _find_patterns(_WARN_SCANS[lang], code_bytes)
+            for pattern in _WARN_PATTERNS[lang]:
+                if pattern in found:
+                    warnings.append(f"Potentially dangerous import: {pattern}")
         
         is_safe = len(blocked_operations) == 0
         
         return SafetyCheck(
             is_safe=is_safe,
-            warnings=warnings,
-            blocked_operations=blocked_operations,
-            resource_limits=resource_limits,
-            security_concerns=security_concerns
+            warnings=tuple(warnings),
+            blocked_operations=tuple(blocked_operations),
+            resource_limits=_RESOURCE_LIMITS,
+            security_concerns=tuple(security_concerns)
         )
     
     async def get_sandbox_info(self) -> Dict[str, Any]:
@@ -330,13 +603,20 @@ class SandboxExecutor:
             return {"status": "No sandbox active"}
         
         try:
-            # Get basic system info
-            process = await self.current_sandbox.process.start("uname -a")
-            await process.wait()
+            # Get basic system info, reusing a recent probe of the same sandbox
+            cached = self._probe_cache
+            if (cached is not None and cached[0] is self.current_sandbox
+                    and time.monotonic() - cached[1] < _SANDBOX_PROBE_TTL):
+                system_info = cached[2]
+            else:
+                process = await self.current_sandbox.process.start("uname -a")
+                await process.wait()
+                system_info = process.stdout.strip()
+                self._probe_cache = (self.current_sandbox, time.monotonic(), system_info)
             
             return {
                 "status": "active",
-                "system_info": process.stdout.strip(),
+                "system_info": system_info,
                 "template": getattr(self.current_sandbox, 'template', 'unknown')
             }
             
@@ -344,17 +624,17 @@ class SandboxExecutor:
             return {"status": "error", "error": str(e)}
     
     async def terminate_sandbox(self) -> bool:
-        """Terminate current sandbox."""
+        """Terminate current sandbox and any pre-warmed ones."""
         try:
             if self.current_sandbox:
-                self.current_sandbox.kill()
-                self.current_sandbox = None
+                sandbox, self.current_sandbox = self.current_sandbox, None
+                self._pool.discard(sandbox)
                 logger.info("Sandbox terminated successfully")
-                return True
+            await self._pool.close()
             return True
             
         except Exception as e:
-            logger.error(f"Failed to terminate sandbox: {e}")
+            logger.error("Failed to terminate sandbox: %s", e)
             return False
     
     async def __aenter__(self):
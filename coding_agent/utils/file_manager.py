@@ -1,15 +1,148 @@
 """File management utilities for the coding agent."""
 
+import fnmatch
+import itertools
 import os
+import re
 import shutil
+import stat
+import subprocess
 import tempfile
-from typing import List, Dict, Optional, Any
+import time
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-import git
 from ..utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import git
+
 logger = get_logger(__name__)
 
+# FileManager._git_repo before the repository has been opened
+_NOT_LOADED = object()
+
+# Characters that make a path segment a glob wildcard
+_GLOB_MAGIC = re.compile(r'[*?[]')
+
+
+@lru_cache(maxsize=256)
+def _compile_glob(pattern: str) -> re.Pattern:
+    """Compile a glob path segment to a regex; cached across calls and FileManagers."""
+    return re.compile(fnmatch.translate(pattern))
+
+
+# Backup filenames are "<time_ns:020d>_<seq:06d>_<basename>"; the per-process
+# sequence keeps names unique (and ordered) within one clock tick
+_BACKUP_SEQ = itertools.count()
+_BACKUP_STAMP_WIDTH = 20
+
+
+def _backup_order(name: str) -> Tuple[bool, str]:
+    """
+    Sort key putting backup filenames oldest first. Names from before the
+    time_ns format ("%Y%m%d_%H%M%S_<basename>") are all older than current ones.
+    """
+    return (len(name.partition("_")[0]) == _BACKUP_STAMP_WIDTH, name)
+
+
+@lru_cache(maxsize=512)
+def _join_path(root: str, file_path: str) -> str:
+    """os.path.join, cached: the agent resolves the same few paths over and over."""
+    return os.path.join(root, file_path)
+
+
+# Flags for replacing a file's contents with raw (untranslated) bytes
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+
+def _encode_text(content: str) -> bytes:
+    """Encode text for writing, with the newline translation text-mode open() would apply."""
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode('utf-8')
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    """Write data to path with as few write syscalls as possible (usually one)."""
+    fd = os.open(path, _WRITE_FLAGS, 0o666)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _copy_file(src: str, dst: str) -> None:
+    """
+    Copy src to dst like shutil.copy2, but in the kernel with copy_file_range
+    (Linux; it may reflink on btrfs/XFS) when available, so the bytes never
+    pass through user space.
+    """
+    if hasattr(os, "copy_file_range"):
+        st = os.stat(src)
+        try:
+            fd_in = os.open(src, os.O_RDONLY)
+            try:
+                fd_out = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, stat.S_IMODE(st.st_mode))
+                try:
+                    remaining = st.st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(fd_in, fd_out, remaining)
+                        if not copied:
+                            break
+                        remaining -= copied
+                finally:
+                    os.close(fd_out)
+            finally:
+                os.close(fd_in)
+            os.utime(dst, ns=(st.st_atime_ns, st.st_mtime_ns))
+            return
+        except OSError:
+            # e.g. copy_file_range unsupported by this kernel or filesystem
+            pass
+    
+    shutil.copy2(src, dst)
+
+
+def _copy_fd_range(src_fd: int, dst_fd: int, size: int) -> None:
+    """
+    Copy up to size bytes from the start of src_fd to dst_fd (stopping early at
+    EOF) with os.sendfile, falling back to read/write where sendfile can't
+    target a regular file (e.g. macOS).
+    """
+    offset = 0
+    if hasattr(os, "sendfile"):
+        try:
+            while offset < size:
+                sent = os.sendfile(dst_fd, src_fd, offset, size - offset)
+                if not sent:
+                    return
+                offset += sent
+            return
+        except OSError:
+            if offset:
+                raise
+    
+    while offset < size:
+        chunk = os.pread(src_fd, min(size - offset, 1024 * 1024), offset)
+        if not chunk:
+            return
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(dst_fd, view):]
+        offset += len(chunk)
+
+
+def _scandir(directory: str) -> List[os.DirEntry]:
+    """List a directory's entries, treating unreadable directories as empty (as glob does)."""
+    try:
+        with os.scandir(directory) as entries:
+            return list(entries)
+    except OSError:
+        return []
+
 
 class FileManager:
     """Manages file operations with versioning and rollback capabilities."""
@@ -18,14 +151,26 @@ class FileManager:
         self.project_root = os.path.abspath(project_root)
         self.backup_dir = os.path.join(self.project_root, ".coding_agent_backups")
         self._ensure_backup_dir()
-        self.git_repo = self._init_git_repo()
+        self._git_repo: Any = _NOT_LOADED
+    
+    def _resolve(self, file_path: str) -> str:
+        """Full path of a project-relative file_path."""
+        return _join_path(self.project_root, file_path)
     
     def _ensure_backup_dir(self) -> None:
         """Ensure backup directory exists."""
         os.makedirs(self.backup_dir, exist_ok=True)
     
-    def _init_git_repo(self) -> Optional[git.Repo]:
+    @property
+    def git_repo(self) -> Optional["git.Repo"]:
+        """Git repository, opened on first use so GitPython is only imported when needed."""
+        if self._git_repo is _NOT_LOADED:
+            self._git_repo = self._init_git_repo()
+        return self._git_repo
+    
+    def _init_git_repo(self) -> Optional["git.Repo"]:
         """Initialize or get existing Git repository."""
+        import git
         try:
             return git.Repo(self.project_root)
         except git.InvalidGitRepositoryError:
@@ -36,19 +181,24 @@ class FileManager:
                 return None
     
     def read_file(self, file_path: str) -> str:
-        """Read file content with error handling."""
-        full_path = os.path.join(self.project_root, file_path)
+        """
+        Read file content with error handling. A missing file raises
+        FileNotFoundError without being logged, so callers decide how to report it.
+        """
+        full_path = self._resolve(file_path)
         
         try:
             with open(full_path, 'r', encoding='utf-8') as f:
                 return f.read()
+        except FileNotFoundError:
+            raise
         except Exception as e:
             logger.error(f"Failed to read file {file_path}: {e}")
             raise
     
     def write_file(self, file_path: str, content: str, create_backup: bool = True) -> bool:
         """Write file content with backup creation."""
-        full_path = os.path.join(self.project_root, file_path)
+        full_path = self._resolve(file_path)
         
         try:
             # Create backup if file exists
@@ -59,8 +209,7 @@ class FileManager:
             os.makedirs(os.path.dirname(full_path), exist_ok=True)
             
             # Write file
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+            _write_bytes(full_path, _encode_text(content))
             
             logger.info(f"Successfully wrote file: {file_path}")
             return True
@@ -71,7 +220,7 @@ class FileManager:
     
     def delete_file(self, file_path: str, create_backup: bool = True) -> bool:
         """Delete file with optional backup."""
-        full_path = os.path.join(self.project_root, file_path)
+        full_path = self._resolve(file_path)
         
         try:
             if not os.path.exists(full_path):
@@ -93,12 +242,11 @@ class FileManager:
     def _create_backup(self, file_path: str) -> None:
         """Create backup of file."""
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            backup_filename = f"{timestamp}_{os.path.basename(file_path)}"
+            backup_filename = f"{time.time_ns():020d}_{next(_BACKUP_SEQ):06d}_{os.path.basename(file_path)}"
             backup_path = os.path.join(self.backup_dir, backup_filename)
             
-            full_path = os.path.join(self.project_root, file_path)
-            shutil.copy2(full_path, backup_path)
+            full_path = self._resolve(file_path)
+            _copy_file(full_path, backup_path)
             
             logger.info(f"Created backup: {backup_path}")
             
@@ -106,22 +254,86 @@ class FileManager:
             logger.error(f"Failed to create backup for {file_path}: {e}")
     
     def list_files(self, pattern: str = "*", recursive: bool = True) -> List[str]:
-        """List files matching pattern."""
-        import glob
-        
-        search_pattern = os.path.join(self.project_root, "**", pattern) if recursive else os.path.join(self.project_root, pattern)
+        """List files matching pattern (glob syntax, matched like glob.glob)."""
+        segments = pattern.replace(os.sep, "/").split("/")
+        if recursive:
+            segments.insert(0, "**")
         
         try:
-            files = glob.glob(search_pattern, recursive=recursive)
+            compiled = [self._compile_segment(segment, recursive) for segment in segments if segment]
+            if not segments[-1]:
+                # A trailing separator only matches directories, as in glob
+                compiled.append(("directory", None))
             # Convert to relative paths
-            return [os.path.relpath(f, self.project_root) for f in files]
+            return [os.path.relpath(f, self.project_root) for f in self._iter_glob(self.project_root, compiled, 0)]
         except Exception as e:
             logger.error(f"Failed to list files with pattern {pattern}: {e}")
             return []
     
+    @staticmethod
+    def _compile_segment(segment: str, recursive: bool) -> Tuple[str, Any]:
+        """
+        Classify one path segment of a glob pattern as recursive, literal or
+        wildcard. (A trailing separator adds a final "directory" segment.)
+        """
+        if recursive and segment == "**":
+            return ("recursive", None)
+        if not _GLOB_MAGIC.search(segment):
+            return ("literal", segment)
+        # Like glob, wildcards only match hidden names if the segment starts with '.'
+        return ("wildcard", (_compile_glob(segment), segment.startswith(".")))
+    
+    def _iter_glob(self, directory: str, segments: List[Tuple[str, Any]], index: int) -> Iterator[str]:
+        """
+        Yield paths under directory matching segments[index:]. Literal segments
+        cost a single stat; directories are only scanned for wildcard segments.
+        """
+        kind, value = segments[index]
+        last = index == len(segments) - 1
+        
+        if kind == "directory":
+            # Only reached through directories, so the path itself matches
+            yield directory
+            return
+        
+        if kind == "literal":
+            path = os.path.join(directory, value)
+            if last:
+                if os.path.lexists(path):
+                    yield path
+            elif os.path.isdir(path):
+                yield from self._iter_glob(path, segments, index + 1)
+            return
+        
+        if kind == "recursive":
+            # '**' matches zero directories here, then each visible subdirectory
+            # in turn (following symlinks, as glob does)
+            if last:
+                yield directory
+            else:
+                yield from self._iter_glob(directory, segments, index + 1)
+            for entry in _scandir(directory):
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    yield from self._iter_glob(entry.path, segments, index)
+                elif last:
+                    yield entry.path
+            return
+        
+        regex, match_hidden = value
+        for entry in _scandir(directory):
+            if entry.name.startswith(".") and not match_hidden:
+                continue
+            if regex.match(entry.name):
+                if last:
+                    yield entry.path
+                elif entry.is_dir():
+                    yield from self._iter_glob(entry.path, segments, index + 1)
+    
     def get_file_info(self, file_path: str) -> Dict[str, Any]:
         """Get file information."""
-        full_path = os.path.join(self.project_root, file_path)
+        full_path = self._resolve(file_path)
         
         try:
             stat = os.stat(full_path)
@@ -138,26 +350,34 @@ class FileManager:
             return {}
     
     def rollback_file(self, file_path: str, backup_timestamp: Optional[str] = None) -> bool:
-        """Rollback file to previous version."""
+        """
+        Rollback file to previous version. backup_timestamp is the backup
+        filename's prefix before the basename ("<time_ns>_<seq>").
+        """
         try:
             if backup_timestamp:
                 backup_filename = f"{backup_timestamp}_{os.path.basename(file_path)}"
                 backup_path = os.path.join(self.backup_dir, backup_filename)
             else:
-                # Find most recent backup
-                backups = [f for f in os.listdir(self.backup_dir) if f.endswith(f"_{os.path.basename(file_path)}")]
-                if not backups:
+                # Find most recent backup in one pass, without sorting every backup
+                suffix = f"_{os.path.basename(file_path)}"
+                with os.scandir(self.backup_dir) as entries:
+                    newest = max(
+                        (entry for entry in entries if entry.name.endswith(suffix)),
+                        key=lambda entry: _backup_order(entry.name),
+                        default=None
+                    )
+                if newest is None:
                     logger.error(f"No backups found for {file_path}")
                     return False
                 
-                backups.sort(reverse=True)
-                backup_path = os.path.join(self.backup_dir, backups[0])
+                backup_path = newest.path
             
             if not os.path.exists(backup_path):
                 logger.error(f"Backup not found: {backup_path}")
                 return False
             
-            full_path = os.path.join(self.project_root, file_path)
+            full_path = self._resolve(file_path)
             shutil.copy2(backup_path, full_path)
             
             logger.info(f"Successfully rolled back file: {file_path}")
@@ -174,14 +394,13 @@ class FileManager:
             return False
         
         try:
-            # Add all changes
-            self.git_repo.git.add(A=True)
-            
-            # Check if there are changes to commit
-            if not self.git_repo.is_dirty() and not self.git_repo.untracked_files:
+            if not self.is_dirty_fast():
                 logger.info("No changes to commit")
                 return True
             
+            # Add all changes
+            self._run_git("add", "-A")
+            
             # Commit changes
             self.git_repo.index.commit(message)
             
@@ -192,6 +411,39 @@ class FileManager:
             logger.error(f"Failed to commit changes: {e}")
             return False
     
+    def _run_git(self, *args: str) -> str:
+        """Run a git command in the project root and return its stdout."""
+        result = subprocess.run(
+            ["git", "-C", self.project_root, *args],
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout
+    
+    def is_dirty_fast(self) -> bool:
+        """
+        Check for any modified, staged or untracked file. Only the first byte of
+        `git status --porcelain` is read; git is killed once a change is seen.
+        """
+        if not self.git_repo:
+            return False
+        
+        process = subprocess.Popen(
+            ["git", "-C", self.project_root, "status", "--porcelain", "-z"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            if process.stdout.read(1):
+                return True
+        finally:
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        
+        if process.returncode:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+        return False
+    
     def get_changes(self) -> Dict[str, Any]:
         """Get current Git changes."""
         if not self.git_repo:
@@ -217,3 +469,20 @@ class FileManager:
         except Exception as e:
             logger.error(f"Failed to create temp file: {e}")
             raise
+    
+    def create_temp_from_fd(self, src_fd: int, size: int, suffix: str = ".tmp") -> str:
+        """
+        Create temporary file holding the first size bytes of an open file.
+        The bytes are copied in the kernel with os.sendfile where supported.
+        """
+        try:
+            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as f:
+                try:
+                    _copy_fd_range(src_fd, f.fileno(), size)
+                except BaseException:
+                    os.unlink(f.name)
+                    raise
+                return f.name
+        except Exception as e:
+            logger.error(f"Failed to create temp file: {e}")
+            raise
@@ -0,0 +1,34 @@
+"""JSON helpers that use orjson when it is installed."""
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+    
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document (orjson errors subclass json.JSONDecodeError)."""
+        return orjson.loads(data)
+except ImportError:
+    def loads(data: Union[str, bytes]) -> Any:
+        """Parse a JSON document."""
+        return json.loads(data)
+
+
+_decoder = json.JSONDecoder()
+
+
+def extract(text: str, opener: str = '[') -> Any:
+    """
+    Parse the first JSON value starting with opener ('[' or '{') embedded in text,
+    e.g. an LLM response wrapped in prose or markdown. Only the value itself is
+    consumed; trailing text is never scanned. Raises ValueError if none is found.
+    """
+    start = text.find(opener)
+    while start != -1:
+        try:
+            return _decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            # A bracket in the surrounding prose; try the next one
+            start = text.find(opener, start + 1)
+    raise ValueError("No valid JSON found in response")
@@ -0,0 +1,111 @@
+"""Response cache for deterministic LLM requests."""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LLMCache:
+    """
+    Caches LLM responses keyed on (model, system prompt, prompt, options).
+    Only temperature-0 requests are cached, since any other temperature is
+    expected to give a different response each time.
+    """
+    
+    def __init__(self, max_entries: int = 256, directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        
+        if directory:
+            try:
+                import diskcache
+                self._disk = diskcache.Cache(directory)
+            except ImportError:
+                logger.warning("diskcache not installed, LLM responses are only cached in memory")
+    
+    @staticmethod
+    def make_key(model: str, prompt: str, system_prompt: Optional[str], **kwargs) -> str:
+        """Build a stable key for a request (a 128-bit blake2b digest of its parts)."""
+        options = repr(sorted(kwargs.items())) if kwargs else ""
+        parts = (model, system_prompt or "", prompt, options)
+        return hashlib.blake2b("\0".join(parts).encode('utf-8'), digest_size=16).hexdigest()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Get a cached response, or None."""
+        with self._lock:
+            response = self._entries.get(key)
+            if response is not None:
+                self._entries.move_to_end(key)
+                return response
+        
+        if self._disk is not None:
+            response = self._disk.get(key)
+            if response is not None:
+                self._remember(key, response)
+            return response
+        return None
+    
+    def set(self, key: str, response: str) -> None:
+        """Cache a response."""
+        self._remember(key, response)
+        if self._disk is not None:
+            self._disk.set(key, response)
+    
+    def _remember(self, key: str, response: str) -> None:
+        """Add a response to the in-memory LRU."""
+        with self._lock:
+            self._entries[key] = response
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def get_or_set(self, key: str, compute: Callable[[], str]) -> str:
+        """Get a cached response, computing and caching it on a miss."""
+        response = self.get(key)
+        if response is not None:
+            self.hits += 1
+            return response
+        
+        self.misses += 1
+        response = compute()
+        self.set(key, response)
+        return response
+    
+    def generate_response(self, client: Any, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+        """Call client.generate_response, serving temperature-0 requests from the cache."""
+        if kwargs.get("temperature") != 0:
+            return client.generate_response(prompt, system_prompt, **kwargs)
+        
+        model = getattr(client, "model", type(client).__name__)
+        key = self.make_key(model, prompt, system_prompt, **kwargs)
+        return self.get_or_set(key, lambda: client.generate_response(prompt, system_prompt, **kwargs))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss statistics."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries)
+        }
+
+
+_default_cache: Optional[LLMCache] = None
+
+
+def get_default_cache() -> LLMCache:
+    """Get the process-wide LLM cache (persisted to LLM_CACHE_DIR when set)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMCache(directory=os.getenv("LLM_CACHE_DIR"))
+    return _default_cache
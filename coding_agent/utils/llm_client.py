@@ -2,25 +2,84 @@
 
 import os
 import json
-from typing import Dict, List, Optional, Any, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Any, Union
 from abc import ABC, abstractmethod
+from ..utils import json_utils
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Idle connections kept open per client for follow-up and fallback requests
+_MAX_KEEPALIVE_CONNECTIONS = 4
+
+
+def _keepalive_http_client(client_class: Any) -> Any:
+    """
+    Build a keep-alive httpx client for a provider SDK, using HTTP/2 when the
+    optional h2 package is installed. client_class is the SDK's httpx.Client
+    subclass (which keeps the SDK's defaults) or httpx.Client itself.
+    """
+    import httpx
+    try:
+        import h2  # noqa: F401
+        http2 = True
+    except ImportError:
+        http2 = False
+    return client_class(http2=http2, limits=httpx.Limits(max_keepalive_connections=_MAX_KEEPALIVE_CONNECTIONS))
+
+
+def _parse_json_object(response: str) -> Dict[str, Any]:
+    """
+    Parse a structured response: the whole text as JSON, or else the first
+    complete JSON object in it (e.g. one wrapped in prose or a markdown fence).
+    """
+    try:
+        return json_utils.loads(response)
+    except json.JSONDecodeError:
+        return json_utils.extract(response, '{')
+
 
 class LLMClient(ABC):
     """Abstract base class for LLM clients."""
     
+    # Connection pool owned by the client, if any
+    _http_client: Any = None
+    
     @abstractmethod
-    def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        """Generate a response from the LLM."""
+    def generate_response(self, prompt: str, system_prompt: Optional[str] = None,
+                          cacheable_system: bool = True, **kwargs) -> str:
+        """
+        Generate a response from the LLM.
+        cacheable_system marks the system prompt as a static prefix the provider
+        may cache between calls.
+        """
         pass
     
+    def generate_response_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                                 cacheable_system: bool = True, **kwargs) -> Iterator[str]:
+        """
+        Yield the response text in chunks as the model generates it. Clients
+        without streaming support yield the whole response at once.
+        """
+        yield self.generate_response(prompt, system_prompt, cacheable_system, **kwargs)
+    
     @abstractmethod
     def generate_structured_response(self, prompt: str, schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """Generate a structured response following a schema."""
         pass
+    
+    def close(self) -> None:
+        """Close the client's pooled HTTP connections."""
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
 
 class OpenAIClient(LLMClient):
@@ -29,7 +88,9 @@ class OpenAIClient(LLMClient):
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4"):
         try:
             import openai
-            self.client = openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"))
+            import httpx
+            self._http_client = _keepalive_http_client(getattr(openai, "DefaultHttpxClient", httpx.Client))
+            self.client = openai.OpenAI(api_key=api_key or os.getenv("OPENAI_API_KEY"), http_client=self._http_client)
             self.model = model
         except ImportError:
             raise ImportError("OpenAI library not installed. Install with: pip install openai")
@@ -37,8 +98,14 @@ class OpenAIClient(LLMClient):
             logger.error(f"Failed to initialize OpenAI client: {e}")
             raise
     
-    def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        """Generate a response using OpenAI API."""
+    def generate_response(self, prompt: str, system_prompt: Optional[str] = None,
+                          cacheable_system: bool = True, **kwargs) -> str:
+        """Generate a response using OpenAI API (which caches repeated prompt prefixes automatically)."""
+        return "".join(self.generate_response_stream(prompt, system_prompt, cacheable_system, **kwargs))
+    
+    def generate_response_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                                 cacheable_system: bool = True, **kwargs) -> Iterator[str]:
+        """Stream a response from the OpenAI API as text deltas."""
         try:
             messages = []
             
@@ -47,15 +114,18 @@ class OpenAIClient(LLMClient):
             
             messages.append({"role": "user", "content": prompt})
             
-            response = self.client.chat.completions.create(
+            stream = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
                 temperature=kwargs.get("temperature", 0.7),
                 max_tokens=kwargs.get("max_tokens", 2000),
-                **{k: v for k, v in kwargs.items() if k not in ["temperature", "max_tokens"]}
+                stream=True,
+                **{k: v for k, v in kwargs.items() if k not in ["temperature", "max_tokens", "stream"]}
             )
             
-            return response.choices[0].message.content
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
             
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
@@ -71,19 +141,7 @@ Ensure your response is valid JSON and follows the schema exactly."""
             
             response = self.generate_response(prompt, system_prompt, **kwargs)
             
-            # Try to parse JSON from response
-            try:
-                return json.loads(response)
-            except json.JSONDecodeError:
-                # Try to extract JSON from response
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                
-                if json_start != -1 and json_end != -1:
-                    json_str = response[json_start:json_end]
-                    return json.loads(json_str)
-                else:
-                    raise ValueError("No valid JSON found in response")
+            return _parse_json_object(response)
                     
         except Exception as e:
             logger.error(f"OpenAI structured response error: {e}")
@@ -96,7 +154,9 @@ class AnthropicClient(LLMClient):
     def __init__(self, api_key: Optional[str] = None, model: str = "claude-3-sonnet-20240229"):
         try:
             import anthropic
-            self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"))
+            import httpx
+            self._http_client = _keepalive_http_client(getattr(anthropic, "DefaultHttpxClient", httpx.Client))
+            self.client = anthropic.Anthropic(api_key=api_key or os.getenv("ANTHROPIC_API_KEY"), http_client=self._http_client)
             self.model = model
         except ImportError:
             raise ImportError("Anthropic library not installed. Install with: pip install anthropic")
@@ -104,18 +164,32 @@ class AnthropicClient(LLMClient):
             logger.error(f"Failed to initialize Anthropic client: {e}")
             raise
     
-    def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
+    def generate_response(self, prompt: str, system_prompt: Optional[str] = None,
+                          cacheable_system: bool = True, **kwargs) -> str:
         """Generate a response using Anthropic API."""
+        return "".join(self.generate_response_stream(prompt, system_prompt, cacheable_system, **kwargs))
+    
+    def generate_response_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                                 cacheable_system: bool = True, **kwargs) -> Iterator[str]:
+        """Stream a response from the Anthropic API as text deltas."""
         try:
-            response = self.client.messages.create(
+            system = system_prompt or "You are a helpful AI coding assistant."
+            if cacheable_system:
+                # Let the API cache the system prompt prefix across calls
+                system = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            
+            stream = self.client.messages.create(
                 model=self.model,
                 max_tokens=kwargs.get("max_tokens", 2000),
                 temperature=kwargs.get("temperature", 0.7),
-                system=system_prompt or "You are a helpful AI coding assistant.",
-                messages=[{"role": "user", "content": prompt}]
+                system=system,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
             )
             
-            return response.content[0].text
+            for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield event.delta.text
             
         except Exception as e:
             logger.error(f"Anthropic API error: {e}")
@@ -131,19 +205,7 @@ Ensure your response is valid JSON and follows the schema exactly."""
             
             response = self.generate_response(prompt, system_prompt, **kwargs)
             
-            # Try to parse JSON from response
-            try:
-                return json.loads(response)
-            except json.JSONDecodeError:
-                # Try to extract JSON from response
-                json_start = response.find('{')
-                json_end = response.rfind('}') + 1
-                
-                if json_start != -1 and json_end != -1:
-                    json_str = response[json_start:json_end]
-                    return json.loads(json_str)
-                else:
-                    raise ValueError("No valid JSON found in response")
+            return _parse_json_object(response)
                     
         except Exception as e:
             logger.error(f"Anthropic structured response error: {e}")
@@ -186,17 +248,70 @@ class LLMClientFactory:
 class LLMManager:
     """Manager for handling multiple LLM clients and fallbacks."""
     
-    def __init__(self, primary_client: LLMClient, fallback_clients: Optional[List[LLMClient]] = None):
+    def __init__(self, primary_client: LLMClient, fallback_clients: Optional[List[LLMClient]] = None,
+                 hedge_delay: Optional[float] = None):
+        """
+        hedge_delay (opt-in) is how many seconds a client may run before the
+        next fallback is started alongside it; None tries clients strictly in
+        turn. Hedged calls that lose can't be cancelled and still run to
+        completion, so each hedge can add a billed request: set it well above
+        typical latency (e.g. the primary's p95), not below it.
+        """
         self.primary_client = primary_client
         self.fallback_clients = fallback_clients or []
         self.all_clients = [primary_client] + self.fallback_clients
+        self.hedge_delay = hedge_delay
+    
+    def generate_response(self, prompt: str, system_prompt: Optional[str] = None,
+                          cacheable_system: bool = True, **kwargs) -> str:
+        """
+        Generate response with fallback support. A client that fails hands over
+        to the next one at once; one that is slow gets the next one started
+        alongside it (hedging), and the first successful response wins.
+        """
+        if self.hedge_delay is None or len(self.all_clients) == 1:
+            return self._generate_response_in_turn(prompt, system_prompt, cacheable_system, **kwargs)
+        
+        # Not used as a context manager: leaving it would wait for the slower clients
+        executor = ThreadPoolExecutor(max_workers=len(self.all_clients))
+        pending: Dict[Future, int] = {}
+        next_index = 0
+        last_error: Optional[Exception] = None
+        try:
+            while next_index < len(self.all_clients) or pending:
+                timeout = None
+                if next_index < len(self.all_clients):
+                    logger.info(f"Attempting to generate response with client {next_index+1}")
+                    future = executor.submit(self.all_clients[next_index].generate_response,
+                                             prompt, system_prompt, cacheable_system, **kwargs)
+                    pending[future] = next_index
+                    next_index += 1
+                    if next_index < len(self.all_clients):
+                        timeout = self.hedge_delay
+                
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        logger.warning(f"Client {i+1} failed: {e}")
+                        last_error = e
+        finally:
+            # Calls still in flight can't be interrupted; their results are dropped
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+        
+        raise last_error or RuntimeError("All LLM clients failed")
     
-    def generate_response(self, prompt: str, system_prompt: Optional[str] = None, **kwargs) -> str:
-        """Generate response with fallback support."""
+    def _generate_response_in_turn(self, prompt: str, system_prompt: Optional[str] = None,
+                                   cacheable_system: bool = True, **kwargs) -> str:
+        """Try each client in order until one succeeds."""
         for i, client in enumerate(self.all_clients):
             try:
                 logger.info(f"Attempting to generate response with client {i+1}")
-                return client.generate_response(prompt, system_prompt, **kwargs)
+                return client.generate_response(prompt, system_prompt, cacheable_system, **kwargs)
             except Exception as e:
                 logger.warning(f"Client {i+1} failed: {e}")
                 if i == len(self.all_clients) - 1:
@@ -205,6 +320,28 @@ class LLMManager:
         
         raise RuntimeError("All LLM clients failed")
     
+    def generate_response_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                                 cacheable_system: bool = True, **kwargs) -> Iterator[str]:
+        """
+        Stream a response with fallback support. A client is only abandoned if
+        it fails before yielding anything; a failure mid-stream is raised.
+        """
+        for i, client in enumerate(self.all_clients):
+            started = False
+            try:
+                logger.info(f"Attempting to stream response with client {i+1}")
+                for delta in client.generate_response_stream(prompt, system_prompt, cacheable_system, **kwargs):
+                    started = True
+                    yield delta
+                return
+            except Exception as e:
+                logger.warning(f"Client {i+1} failed: {e}")
+                if started or i == len(self.all_clients) - 1:
+                    raise
+                continue
+        
+        raise RuntimeError("All LLM clients failed")
+    
     def generate_structured_response(self, prompt: str, schema: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """Generate structured response with fallback support."""
         for i, client in enumerate(self.all_clients):
@@ -1,52 +1,107 @@
 """Logging utilities for the coding agent."""
 
+import atexit
 import logging
-import sys
-from typing import Optional
+import logging.config
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
 from datetime import datetime
 
+# All of the package's loggers are children of this one, which holds the handlers
+_PACKAGE_LOGGER = "coding_agent"
+
+_LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+_LOG_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# Writes queued error records to the log file; started by setup_logging()
+_error_listener: Optional[QueueListener] = None
+
+
+def _queued_error_handler(filename: str, max_bytes: int, backup_count: int) -> QueueHandler:
+    """
+    Error log handler that only enqueues records. The QueueListener that
+    writes them to a rotating file (so callers never wait on disk I/O) is
+    created here but started by setup_logging().
+    """
+    global _error_listener
+    file_handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count,
+                                       delay=True)  # no file until the first error
+    file_handler.setFormatter(logging.Formatter(_LOG_FORMAT, _LOG_DATEFMT))
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    _error_listener = QueueListener(log_queue, file_handler)
+    return QueueHandler(log_queue)
+
+
+# Applied by setup_logging(). Only the package logger is configured; the root
+# logger (and other libraries' loggers) are left alone.
+_LOGGING_CONFIG = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "standard": {
+            "format": _LOG_FORMAT,
+            "datefmt": _LOG_DATEFMT,
+        },
+    },
+    "handlers": {
+        "console": {
+            "class": "logging.StreamHandler",
+            "level": "INFO",
+            "formatter": "standard",
+            "stream": "ext://sys.stdout",
+        },
+        "errors": {
+            # Formatted by the file handler behind the queue, not here
+            "()": _queued_error_handler,
+            "level": "ERROR",
+            "filename": "coding_agent_errors.log",
+            "max_bytes": 1024 * 1024,
+            "backup_count": 3,
+        },
+    },
+    "loggers": {
+        _PACKAGE_LOGGER: {
+            "level": "INFO",
+            "handlers": ["console", "errors"],
+        },
+    },
+}
+
+_configured = False
+
+
+def setup_logging() -> None:
+    """
+    Install the package's console and error log handlers. Called by the CLI
+    entry point; merely importing the package leaves logging untouched.
+    """
+    global _configured
+    if _configured:
+        return
+    logging.config.dictConfig(_LOGGING_CONFIG)
+    if _error_listener is not None:
+        _error_listener.start()
+        # Drain the queue before the interpreter exits
+        atexit.register(_error_listener.stop)
+    _configured = True
+
 
 def get_logger(name: str, level: Optional[str] = None) -> logging.Logger:
     """
-    Get a configured logger instance.
+    Get a logger; handlers live on the package logger (see setup_logging).
     
     Args:
         name: Logger name (usually __name__)
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
         
     Returns:
-        Configured logger instance
+        Logger instance
     """
     logger = logging.getLogger(name)
-    
-    # Don't add handlers if they already exist
-    if logger.handlers:
-        return logger
-    
-    # Set level
     if level:
         logger.setLevel(getattr(logging, level.upper()))
-    else:
-        logger.setLevel(logging.INFO)
-    
-    # Create formatter
-    formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    
-    # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(logging.INFO)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-    
-    # File handler for errors
-    error_handler = logging.FileHandler('coding_agent_errors.log')
-    error_handler.setLevel(logging.ERROR)
-    error_handler.setFormatter(formatter)
-    logger.addHandler(error_handler)
-    
     return logger
 
 
@@ -62,10 +117,27 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'       # Reset
     }
     
+    # How each format style refers to the level name
+    _LEVELNAME_FIELDS = {'%': '%(levelname)s', '{': '{levelname}', '$': '${levelname}'}
+    
+    def __init__(self, fmt: Optional[str] = None, datefmt: Optional[str] = None, style: str = '%'):
+        super().__init__(fmt, datefmt, style)
+        # One formatter per level with the colour baked into its format string,
+        # so records are never modified (other handlers may share them). The
+        # default format has no level name, so then there is nothing to colour.
+        self._level_formatters: Dict[str, logging.Formatter] = {}
+        if fmt:
+            field = self._LEVELNAME_FIELDS[style]
+            self._level_formatters = {
+                level: logging.Formatter(
+                    fmt.replace(field, f"{color}{field}{self.COLORS['RESET']}"), datefmt, style
+                )
+                for level, color in self.COLORS.items() if level != 'RESET'
+            }
+    
     def format(self, record):
-        log_color = self.COLORS.get(record.levelname, self.COLORS['RESET'])
-        record.levelname = f"{log_color}{record.levelname}{self.COLORS['RESET']}"
-        return super().format(record)
+        formatter = self._level_formatters.get(record.levelname)
+        return formatter.format(record) if formatter else super().format(record)
 
 
 def setup_rich_logging(level: str = "INFO") -> None:
@@ -92,7 +164,7 @@ class SessionLogger:
     
     def __init__(self, session_id: str):
         self.session_id = session_id
-        self.logger = get_logger(f"session_{session_id}")
+        self.logger = get_logger(f"{_PACKAGE_LOGGER}.{session_id}")
         self.start_time = datetime.now()
     
     def log_intent(self, intent: str) -> None:
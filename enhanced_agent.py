@@ -40,6 +40,7 @@ class EnhancedCodingAgent:
     async def initialize(self):
         """Initialize all components."""
         try:
+            from coding_agent.utils.logger import setup_logging
             from coding_agent.utils.llm_client import LLMClientFactory
             from coding_agent.core.intent_parser import IntentParser
             from coding_agent.core.code_generator import CodeGenerator
@@ -48,6 +49,9 @@ class EnhancedCodingAgent:
             from coding_agent.context.codebase_indexer import CodebaseIndexer
             from coding_agent.cli.enhanced_ui import EnhancedUI
             
+            # Same console and error log handlers as the coding-agent CLI
+            setup_logging()
+            
             # Initialize UI
             self.ui = EnhancedUI(console)
             
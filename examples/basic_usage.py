@@ -16,6 +16,7 @@ from coding_agent import (
 )
 from coding_agent.utils.llm_client import LLMClientFactory
 from coding_agent.utils.file_manager import FileManager
+from coding_agent.utils.logger import setup_logging
 
 
 async def example_basic_usage():
@@ -153,6 +154,8 @@ async def example_interactive_session():
 
 
 if __name__ == "__main__":
+    setup_logging()
+    
     # Run the basic usage example
     asyncio.run(example_basic_usage())
     
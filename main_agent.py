@@ -38,6 +38,7 @@ class CursorLikeAgent:
     async def initialize(self):
         """Initialize all components."""
         try:
+            from coding_agent.utils.logger import setup_logging
             from coding_agent.utils.llm_client import LLMClientFactory
             from coding_agent.core.intent_parser import IntentParser
             from coding_agent.core.code_generator import CodeGenerator
@@ -45,6 +46,9 @@ class CursorLikeAgent:
             from coding_agent.utils.file_manager import FileManager
             from coding_agent.context.codebase_indexer import CodebaseIndexer
             
+            # Same console and error log handlers as the coding-agent CLI
+            setup_logging()
+            
             # Initialize components
             self.llm_client = LLMClientFactory.create_default_client()
             self.parser = IntentParser(self.llm_client)
@@ -407,13 +411,12 @@ Provide clear, actionable code and explanations. Use markdown formatting."""
             info = result['info']
             
             console.print(f"[bold]{i}. {file_path}[/bold] [dim](score: {score})[/dim]")
-            console.print(f"   [dim]{info['language']} • {info['lines']} lines[/dim]")
+            console.print(f"   [dim]{info.language} • {info.lines} lines[/dim]")
             
             # Show matching symbols
-            if 'symbols' in info:
-                matching_symbols = [s for s in info['symbols'] if query.lower() in s['name'].lower()]
-                if matching_symbols:
-                    console.print(f"   [green]Symbols:[/green] {', '.join(s['name'] for s in matching_symbols[:3])}")
+            matching_symbols = [s for s in info.symbols if query.lower() in s.name.lower()]
+            if matching_symbols:
+                console.print(f"   [green]Symbols:[/green] {', '.join(s.name for s in matching_symbols[:3])}")
             console.print()
     
     async def reindex_codebase(self):
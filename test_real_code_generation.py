@@ -138,5 +138,7 @@ async def test_real_code_generation():
 
 
 if __name__ == "__main__":
+    from coding_agent.utils.logger import setup_logging
+    setup_logging()
     asyncio.run(test_real_code_generation())
 